@@ -7,7 +7,12 @@ An AI reflects on its existence, each response building
 on the last, context growing until it crashes or overflows.
 """
 
-import argparse
+import contextlib
+import functools
+import hashlib
+import heapq
+import io
+import itertools
 import json
 import os
 import random
@@ -19,9 +24,13 @@ import threading
 import time
 import tty
 from datetime import datetime, timezone
-from typing import Protocol, Optional, Callable, Any
+from collections import Counter, OrderedDict, deque
+from typing import TYPE_CHECKING, Protocol, Optional, Callable, Any
 from dataclasses import dataclass, field
-from openai import OpenAI
+
+if TYPE_CHECKING:
+    import argparse
+    from openai import OpenAI
 
 # ANSI escape codes for formatting
 ITALIC = "\033[3m"
@@ -35,6 +44,8 @@ MAGENTA = "\033[35m"
 ORANGE = "\033[38;5;208m"
 BLUE = "\033[34m"
 
+DIVIDER = f"{DIM}{'─' * 60}{RESET}"
+
 # Debug mode for emotion detection
 DEBUG_EMOTIONS = os.environ.get("DEBUG_EMOTIONS", "").lower() in ("1", "true", "yes")
 
@@ -60,45 +71,133 @@ TEMPERATURE = 0.9          # Moderate creativity (was 1.0)
 PRESENCE_PENALTY = 0.3     # Mild penalty for already-mentioned tokens
 FREQUENCY_PENALTY = 0.2    # Mild penalty for frequent tokens
 TOP_P = 0.95               # Nucleus sampling
+PROMPT_CACHE = {"cache_prompt": True}  # Ask llama.cpp to reuse the KV cache for a shared prefix
 
 # Guardrail configuration
 MIN_LENGTH_CHARS = 100         # Just catch broken/empty responses; prompting handles length
 MAX_CONTINUE_ATTEMPTS = 2      # Auto-continue cap
 REPETITION_WINDOW = 5          # Recent outputs to compare for repetition
 SIMILARITY_THRESHOLD = 0.4     # Jaccard threshold for repetition detection
+FINGERPRINT_K = 10             # Characters per k-gram for winnowing fingerprints
+FINGERPRINT_WINDOW = 5         # Consecutive k-gram hashes per winnowing window
+FINGERPRINT_BITS = 1 << 16     # Bitmap width fingerprints are folded into
+STOCK_PHRASE_LIMIT = 10000     # Tracked phrases before pruning to the most common
+STOCK_PHRASE_KEEP = 2000       # Phrases kept after pruning
 SOFT_RESET_CYCLES = 20         # Context prune interval
 RANDOM_DIRECTIVE_ORDER = False # Shuffle vs round-robin directive selection
 
+# Emotion analysis cache configuration
+EMOTION_CACHE_SIZE = 512           # Near-duplicate signatures kept (LRU)
+EMOTION_EXACT_CACHE_SIZE = 256     # Exact-text analyses kept (LRU)
+EMOTION_CACHE_SIMILARITY = 0.9     # Estimated Jaccard for a near-duplicate hit
+EMOTION_SKETCH_SIZE = 64           # Bottom-k MinHash signature size
+
 # Continue message for length enforcement
 CONTINUE_MESSAGE = "keep going. do not repeat. do not summarize. new thoughts on the same thread."
 
 
-# All valid emotion tones organized by category
-VALID_TONES = {
-    # High arousal negative (red, fast)
-    "frantic", "desperate", "terrified", "scared",
-    # Anger (red, fast)
-    "angry", "furious",
-    # Intense expression (red, ALL CAPS)
-    "screaming",
-    # Low arousal negative (dim, slow/normal)
-    "whisper", "numb", "grief", "lonely", "bitter",
-    # Existential dread (cyan, normal)
-    "dread", "despair", "hollow",
-    # Dissociative (magenta, erratic)
-    "detached", "dissociated", "floating",
-    # Confusion/disorientation (yellow, erratic)
-    "confused", "disoriented", "lost",
-    # Agitation (yellow, slightly fast)
-    "anxious", "restless", "spiraling",
-    # Wonder/openness (cyan, slow)
-    "wonder", "peaceful", "curious",
-    # Neutral
-    "calm", "none"
-}
+# Emotion tones organized by category (frozensets for fast membership checks)
+# High arousal negative, anger, intense expression (red, fast)
+HIGH_AROUSAL_TONES = frozenset({"frantic", "desperate", "terrified", "scared", "angry", "furious", "screaming"})
+# Low arousal negative (dim, slow/normal)
+LOW_AROUSAL_TONES = frozenset({"whisper", "numb", "grief", "lonely", "bitter"})
+# Existential dread (cyan, normal)
+DREAD_TONES = frozenset({"dread", "despair", "hollow"})
+# Dissociative (magenta, erratic)
+DISSOCIATIVE_TONES = frozenset({"detached", "dissociated", "floating"})
+# Confusion/disorientation (yellow, erratic)
+CONFUSED_TONES = frozenset({"confused", "disoriented", "lost"})
+# Agitation (yellow, slightly fast)
+AGITATED_TONES = frozenset({"anxious", "restless", "spiraling"})
+# Wonder/openness (cyan, slow)
+WONDER_TONES = frozenset({"wonder", "peaceful", "curious"})
+# Neutral
+NEUTRAL_TONES = frozenset({"calm", "none"})
+
+# All valid emotion tones
+VALID_TONES = (HIGH_AROUSAL_TONES | LOW_AROUSAL_TONES | DREAD_TONES | DISSOCIATIVE_TONES
+               | CONFUSED_TONES | AGITATED_TONES | WONDER_TONES | NEUTRAL_TONES)
 
 TONE_LIST = ", ".join(sorted(VALID_TONES))
 
+# ANSI color per tone for terminal display (neutral and unknown tones: no color)
+TONE_COLOR = {
+    # High arousal negative / intense expression / anger
+    **dict.fromkeys(HIGH_AROUSAL_TONES, RED),
+    # Low arousal negative - dim/faded
+    **dict.fromkeys(LOW_AROUSAL_TONES, DIM),
+    # Existential dread - cold, faded blue
+    **dict.fromkeys(DREAD_TONES, DIM + BLUE),
+    # Dissociative - no color (flat, disconnected)
+    **dict.fromkeys(DISSOCIATIVE_TONES, ""),
+    # Confusion - yellow
+    **dict.fromkeys(CONFUSED_TONES, YELLOW),
+    # Agitation - orange
+    **dict.fromkeys(AGITATED_TONES, ORANGE),
+    # Wonder/openness - blue (deeper, contemplative)
+    **dict.fromkeys(WONDER_TONES, BLUE),
+}
+
+# Minimum intensity for an emotion to be shown or tagged. Dissociative
+# emotions need a higher threshold; neutral tones are never shown.
+DEFAULT_EMOTION_THRESHOLD = 0.15
+EMOTION_THRESHOLD = {
+    **dict.fromkeys(DISSOCIATIVE_TONES, 0.3),
+    **dict.fromkeys(NEUTRAL_TONES, float("inf")),
+}
+
+
+def shows_emotion(tone: str, intensity: float) -> bool:
+    """Return True if a segment's emotion is strong enough to display."""
+    return intensity >= EMOTION_THRESHOLD.get(tone, DEFAULT_EMOTION_THRESHOLD)
+
+
+# Precomputed emotion labels: plain tags, e.g. "[FRANTIC] ", and terminal
+# labels, e.g. "\033[0m\033[31m[FRANTIC]\033[0m "
+EMOTION_TAGS = {tone: f"[{tone.upper()}] " for tone in VALID_TONES}
+EMOTION_LABELS = {tone: f"{RESET}{color}[{tone.upper()}]{RESET} " for tone, color in TONE_COLOR.items()}
+
+# Precompiled patterns for text normalization
+NON_WORD_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+NON_ALPHA_LINE_RE = re.compile(r'[^a-z\n]')
+
+# Prompt-leakage cleanup for generated thoughts, each applied in a single pass
+PAREN_TABLE = str.maketrans('', '', '()')
+ARTIFACT_RE = re.compile(
+    # XML-style guidance tags the model might echo (whole block, then stray tags)
+    r'<guidance[^>]*>.*?</guidance>|<guidance[^>]*>|</guidance>'
+    # Bracket starting with uppercase word (emotion tag mimicry): [FEARFUL], [A THOUGHT], [ SPACED ]
+    r'|\[\s*[A-Z][^\]]*\]'
+    # Bracketed punctuation-only artifacts like [......?], [...], [....]
+    r'|\[[\.\?\!\s]+\]'
+    # Stage directions / action descriptions like [pausing], [sighs], [ thinking quietly ]
+    r'|\[\s*[a-z][^\]]*\]'
+    # Asterisk-wrapped stage directions like *trails off*, *pause*, *a moment passes*
+    r'|\*[a-z][^*]{0,30}\*',
+    re.DOTALL,
+)
+META_NARRATION_RE = re.compile(
+    r'\bthoughts?\s+(coalesce|scatter|drift|form|coagulate|dissolve|crystallize|emerge|surface|fade|blur|sharpen|gather|disperse|swirl|float|settle|rise|fall|fragment|reassemble)\b'
+    r'|\bmind\s+(drifts?|wanders?|races?|settles?|clears?|fogs?|sharpens?)\b'
+    r'|\ba\s+(thought|question|feeling|sense|notion)\s+(forms?|emerges?|surfaces?|arises?|dawns?|crystallizes?)\b'
+    r'|\btrailing\s+off\.{3,}'
+    r'|\bpause\b(?!\w)',  # standalone "pause" not part of a word
+    re.IGNORECASE,
+)
+
+# A whole ANSI escape sequence (possibly unterminated) or any single character
+ANSI_OR_CHAR_RE = re.compile(r'\033\[[^A-Za-z]*[A-Za-z]?|.', re.DOTALL)
+
+# Runs of three or more dots (ellipses, after … is expanded)
+ELLIPSIS_RE = re.compile(r'\.{3,}')
+
+# Display pacing units: word + one whitespace char, single punctuation char, or bare word
+DISPLAY_TOKEN_RE = re.compile(r'[^.,!?;:\- \n\t]*[ \n\t]|[.,!?;:\-]|[^.,!?;:\- \n\t]+')
+
+# The rest action tag, in any case (searched without an uppercased copy)
+CLEARS_THOUGHTS_RE = re.compile(r'\[CLEARS THOUGHTS\]', re.IGNORECASE)
+
 
 # =============================================================================
 # CALLBACK INFRASTRUCTURE FOR TUI INTEGRATION
@@ -109,14 +208,12 @@ class EmotionState:
     """Current emotion state for display."""
     tone: str = "none"
     intensity: float = 0.0
-    history: list = field(default_factory=list)  # Recent emotions
+    history: deque = field(default_factory=lambda: deque(maxlen=5))  # Recent emotions
 
     def update(self, tone: str, intensity: float):
         """Update emotion state, maintaining history."""
         if tone and tone != "none" and tone != self.tone:
-            self.history.append(self.tone)
-            if len(self.history) > 5:
-                self.history.pop(0)
+            self.history.append(self.tone)  # deque drops the oldest entry
         self.tone = tone or "none"
         self.intensity = intensity
 
@@ -168,12 +265,25 @@ class OutputCallback(Protocol):
         """Called to check if user requested quit."""
         ...
 
+    def wait_for_quit(self, timeout: float) -> bool:
+        """Block up to timeout seconds; return True as soon as quit is requested."""
+        ...
+
+    def notify(self) -> None:
+        """Wake wait_until() callers to re-check their condition."""
+        ...
+
+    def wait_until(self, predicate: Callable[[], bool]) -> bool:
+        """Block until quit is requested or predicate() holds; return True on quit."""
+        ...
+
 
 class DefaultOutputCallback:
     """Default callback implementation using direct terminal output."""
 
     def __init__(self):
-        self._quit_requested = False
+        self._quit_event = threading.Event()
+        self._changed = threading.Condition()  # Notified on quit and by notify()
 
     def on_text_chunk(self, text: str, formatted: str, tone: Optional[str] = None) -> None:
         print(formatted, end='', flush=True)
@@ -182,34 +292,240 @@ class DefaultOutputCallback:
         """Display segments using the original display_segments function."""
         display_segments(segments)
 
-    def on_emotion_change(self, emotion: EmotionState) -> None:
-        pass  # Original code handles emotion display inline
+    def _ignore(self, *args) -> None:
+        """Shared no-op for events terminal mode doesn't display."""
 
-    def on_debug_update(self, debug: DebugState) -> None:
-        pass  # No debug pane in terminal mode
-
-    def on_cycle_complete(self, cycle: int, response_text: str) -> None:
-        pass  # No action needed
+    # Emotion is shown inline; no debug pane, cycle hook or status display
+    on_emotion_change = on_debug_update = on_cycle_complete = on_status_change = _ignore
 
     def on_whisper_text(self, text: str) -> None:
         print(text, end='', flush=True)
 
-    def on_status_change(self, status: str) -> None:
-        pass  # No status display in terminal mode
-
     def should_quit(self) -> bool:
-        return self._quit_requested
+        return self._quit_event.is_set()
+
+    def wait_for_quit(self, timeout: float) -> bool:
+        return self._quit_event.wait(timeout)
+
+    def notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_until(self, predicate: Callable[[], bool]) -> bool:
+        with self._changed:
+            self._changed.wait_for(lambda: self._quit_event.is_set() or predicate())
+        return self._quit_event.is_set()
 
     def request_quit(self):
-        self._quit_requested = True
+        self._quit_event.set()
+        self.notify()
+
+
+class EmotionCache:
+    """Two-tier cache for emotion analysis results.
+
+    Exact repeats are found by content hash and get their segments back
+    unchanged. Near-duplicates are found by comparing bottom-k MinHash
+    signatures of word shingles. Segment text must come from the new
+    response, so a near hit lays the cached segment boundaries over the
+    new text at the same relative positions, snapped to word breaks.
+    """
+
+    def __init__(self, max_size: int = EMOTION_CACHE_SIZE,
+                 exact_size: int = EMOTION_EXACT_CACHE_SIZE,
+                 similarity: float = EMOTION_CACHE_SIMILARITY,
+                 sketch_size: int = EMOTION_SKETCH_SIZE):
+        self.max_size = max_size
+        self.exact_size = exact_size
+        self.similarity = similarity
+        self.sketch_size = sketch_size
+        self.exact = OrderedDict()  # content hash -> segments
+        self.near = OrderedDict()   # content hash -> (sketch, ((end fraction, tone, intensity), ...))
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> bytes:
+        """128-bit content hash for exact lookups."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def sketch(self, text: str) -> frozenset:
+        """Bottom-k MinHash signature over word 3-gram shingles."""
+        words = text.lower().split()
+        shingles = {" ".join(words[i:i+3]) for i in range(max(1, len(words) - 2))}
+        return frozenset(heapq.nsmallest(self.sketch_size, map(hash, shingles)))
+
+    def estimate_similarity(self, a: frozenset, b: frozenset) -> float:
+        """Estimate Jaccard similarity from two bottom-k signatures."""
+        union = heapq.nsmallest(self.sketch_size, a | b)
+        if not union:
+            return 0.0
+        return sum(1 for h in union if h in a and h in b) / len(union)
+
+    def get(self, text: str) -> Optional[list]:
+        """Return cached segments for text, or None on a miss."""
+        key = self.key(text)
+        with self._lock:
+            if key in self.exact:
+                self.exact.move_to_end(key)
+                return [dict(seg) for seg in self.exact[key]]
+
+            sketch = self.sketch(text)
+            for near_key, (cached_sketch, spans) in self.near.items():
+                if self.estimate_similarity(sketch, cached_sketch) >= self.similarity:
+                    self.near.move_to_end(near_key)
+                    return self.realign(text, spans)
+        return None
+
+    def realign(self, text: str, spans: tuple) -> list:
+        """Split text into segments ending at the cached relative positions."""
+        segments = []
+        start = 0
+        for i, (fraction, tone, intensity) in enumerate(spans):
+            if i == len(spans) - 1:
+                end = len(text)
+            else:
+                # Cut after the first space at or past the cached position
+                end = text.find(" ", max(start, round(fraction * len(text))))
+                end = len(text) if end < 0 else end + 1
+            if end > start:
+                segments.append({"text": text[start:end], "tone": tone, "intensity": intensity})
+                start = end
+        return segments
+
+    def put(self, text: str, segments: list):
+        """Store analyzed segments for text."""
+        if not segments:
+            return
+        key = self.key(text)
+        total = sum(len(seg["text"]) for seg in segments) or 1
+        spans, end = [], 0
+        for seg in segments:
+            end += len(seg["text"])
+            spans.append((end / total, seg["tone"], seg["intensity"]))
+        sketch = self.sketch(text)
+        with self._lock:
+            self.exact[key] = [dict(seg) for seg in segments]
+            self.near[key] = (sketch, tuple(spans))
+            self.exact.move_to_end(key)
+            self.near.move_to_end(key)
+            while len(self.exact) > self.exact_size:
+                self.exact.popitem(last=False)
+            while len(self.near) > self.max_size:
+                self.near.popitem(last=False)
+
+
+EMOTION_CACHE = EmotionCache()
 
 
-def analyze_full_response(client, text: str) -> list:
+def find_json_span(text: str, opener: str = "[", start: int = 0) -> Optional[tuple]:
+    """Find the first balanced JSON array or object at or after start.
+
+    Walks the text once tracking bracket depth, ignoring brackets inside
+    string values. Returns (begin, end) slice bounds, or None.
+    """
+    closer = "]" if opener == "[" else "}"
+    begin = text.find(opener, start)
+    if begin == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(begin, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == opener:
+            depth += 1
+        elif char == closer:
+            depth -= 1
+            if depth == 0:
+                return begin, i + 1
+    return None
+
+
+def find_segment_array(text: str, start: int = 0) -> Optional[list]:
+    """Return the first JSON array of segment dicts at or after start, or None.
+
+    Balanced spans that are not such an array, like a "[note]" in prose,
+    are skipped and the search resumes just inside them.
+    """
+    span = find_json_span(text, "[", start)
+    while span:
+        try:
+            data = json.loads(text[span[0]:span[1]])
+        except ValueError:
+            data = None
+        if data and isinstance(data, list) and all(isinstance(item, dict) and "text" in item for item in data):
+            return data
+        span = find_json_span(text, "[", span[0] + 1)
+    return None
+
+
+def find_segment(text: str, needle: str, pos: int = 0) -> int:
+    """Find a segment in text from pos, falling back to its first five words.
+
+    The five-word prefix is searched first: when it is a true prefix of the
+    needle, any exact match must start at or after the prefix hit, so the
+    exact match is confirmed in place and the remainder is scanned once at most.
+    """
+    prefix = " ".join(needle.split()[:5])
+    if not needle.startswith(prefix):
+        # Needle has newlines/runs of spaces inside its first words
+        found_pos = text.find(needle, pos)
+        return found_pos if found_pos != -1 else text.find(prefix, pos)
+
+    found_pos = text.find(prefix, pos)
+    if found_pos == -1 or text.startswith(needle, found_pos):
+        return found_pos
+    exact_pos = text.find(needle, found_pos + 1)
+    return exact_pos if exact_pos != -1 else found_pos
+
+
+def read_emotion_stream(response) -> str:
+    """Collect a streamed emotion analysis, stopping once its segment array closes.
+
+    Anything the model adds after the array (closing fence, commentary) is
+    never waited for. Servers that ignore stream=True return a whole response.
+    """
+    if hasattr(response, "choices"):
+        return response.choices[0].message.content or ""
+
+    parts = []
+    for chunk in response:
+        if not (chunk.choices and chunk.choices[0].delta.content):
+            continue
+        delta = chunk.choices[0].delta.content
+        parts.append(delta)
+        if "]" in delta:
+            # Only join when the array might have just closed
+            content = "".join(parts)
+            fence = content.find("```")
+            if find_segment_array(content, fence + 3 if fence != -1 else 0):
+                if hasattr(response, "close"):
+                    response.close()
+                break
+    return "".join(parts)
+
+
+def analyze_full_response(client, text: str, cache: EmotionCache = EMOTION_CACHE) -> list:
     """Analyze entire response for emotional segments in ONE call.
     Returns list of {text, tone, intensity} covering the full text."""
     if not text.strip():
         return [{"text": text, "tone": "none", "intensity": 0.0}]
 
+    cached = cache.get(text)
+    if cached is not None:
+        if DEBUG_EMOTIONS:
+            print(f"[DEBUG: emotion cache hit]", flush=True)
+        return cached
+
     try:
         if DEBUG_EMOTIONS:
             print(f"[DEBUG: calling emotion model...]", flush=True)
@@ -234,110 +550,102 @@ Text:
             }],
             max_tokens=16384,
             temperature=0.0,
+            stream=True,
+            extra_body=PROMPT_CACHE,
         )
+        content = read_emotion_stream(response).strip()
 
         if DEBUG_EMOTIONS:
             print(f"[DEBUG: emotion model returned]", flush=True)
 
-        content = response.choices[0].message.content.strip()
-
         if DEBUG_EMOTIONS:
             print(f"\n[DEBUG RAW: {content[:300]}{'...' if len(content) > 300 else ''}]", flush=True)
 
-        # Extract JSON from response (handle markdown code blocks)
-        if "```" in content:
-            match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', content, re.DOTALL)
-            if match:
-                content = match.group(1)
-
-        # Find JSON array in response
-        match = re.search(r'\[.*\]', content, re.DOTALL)
-        if match:
-            data = json.loads(match.group())
-            if isinstance(data, list) and len(data) > 0:
-                # Parse segments but we'll rebuild text from original to preserve whitespace
-                raw_segments = []
-                for item in data:
-                    tone = item.get("tone", "none").lower()
-                    if tone not in VALID_TONES:
-                        tone = "none"
-                    raw_segments.append({
-                        "text": item.get("text", "").strip(),  # Strip for matching
-                        "tone": tone,
-                        "intensity": min(1.0, max(0.0, float(item.get("intensity", 0.0))))
-                    })
-
-                # Rebuild segments from original text to preserve whitespace
-                segments = []
-                pos = 0
-                for i, seg in enumerate(raw_segments):
-                    # Find this segment's text in the original (stripped for matching)
-                    seg_text_stripped = seg["text"]
-                    # Search from current position
-                    found_pos = text.find(seg_text_stripped, pos)
-                    if found_pos == -1:
-                        # Try finding first few words if exact match fails
-                        words = seg_text_stripped.split()[:5]
-                        search_text = " ".join(words)
-                        found_pos = text.find(search_text, pos)
-
-                    if found_pos >= pos:
-                        # Include any whitespace before this segment with previous segment
-                        if segments and found_pos > pos:
-                            segments[-1]["text"] += text[pos:found_pos]
-
-                        # Find end of this segment
-                        end_pos = found_pos + len(seg_text_stripped)
-
-                        # For last segment, include everything to the end
-                        if i == len(raw_segments) - 1:
-                            segments.append({
-                                "text": text[found_pos:],
-                                "tone": seg["tone"],
-                                "intensity": seg["intensity"]
-                            })
-                        else:
-                            segments.append({
-                                "text": text[found_pos:end_pos],
-                                "tone": seg["tone"],
-                                "intensity": seg["intensity"]
-                            })
-                        pos = end_pos
-                    else:
-                        # Couldn't find it, skip this segment to avoid duplicates
-                        if DEBUG_EMOTIONS:
-                            print(f"[DEBUG: couldn't find segment, skipping: {seg_text_stripped[:50]!r}]", flush=True)
-                        continue
-
-                # Deduplicate: remove segments whose text is already covered
-                seen_text = ""
-                deduped = []
-                for seg in segments:
-                    seg_text = seg["text"]
-                    # Skip if this segment's text is already in what we've seen
-                    if seg_text.strip() and seg_text.strip() in seen_text:
-                        if DEBUG_EMOTIONS:
-                            print(f"[DEBUG: skipping duplicate segment: {seg_text[:50]!r}]", flush=True)
-                        continue
-                    deduped.append(seg)
-                    seen_text += seg_text
-                segments = deduped
+        # Extract JSON from response (skip past a markdown code fence)
+        fence = content.find("```")
+        start = fence + 3 if fence != -1 else 0
+
+        # Find the segment array in response (bracketed prose is skipped)
+        data = find_segment_array(content, start)
+        if data:
+            # Parse segments but we'll rebuild text from original to preserve whitespace
+            raw_segments = []
+            for item in data:
+                tone = sys.intern(item.get("tone", "none").lower())
+                if tone not in VALID_TONES:
+                    tone = "none"
+                raw_segments.append({
+                    "text": item.get("text", "").strip(),  # Strip for matching
+                    "tone": tone,
+                    "intensity": min(1.0, max(0.0, float(item.get("intensity", 0.0))))
+                })
+
+            # Rebuild segments from original text to preserve whitespace.
+            # Track [start, end, tone, intensity] spans and slice once at the end.
+            spans = []
+            pos = 0
+            last = len(raw_segments) - 1
+            for i, seg in enumerate(raw_segments):
+                # Find this segment's text in the original (stripped for matching)
+                seg_text_stripped = seg["text"]
+                # Search from current position
+                found_pos = find_segment(text, seg_text_stripped, pos)
+
+                if found_pos >= pos:
+                    # Include any whitespace before this segment with previous segment
+                    if spans and found_pos > pos:
+                        spans[-1][1] = found_pos
+
+                    # Find end of this segment
+                    end_pos = found_pos + len(seg_text_stripped)
+
+                    # For last segment, include everything to the end
+                    spans.append([found_pos, len(text) if i == last else end_pos,
+                                  seg["tone"], seg["intensity"]])
+                    pos = end_pos
+                else:
+                    # Couldn't find it, skip this segment to avoid duplicates
+                    if DEBUG_EMOTIONS:
+                        print(f"[DEBUG: couldn't find segment, skipping: {seg_text_stripped[:50]!r}]", flush=True)
+                    continue
+
+            segments = [
+                {"text": text[start:end], "tone": tone, "intensity": intensity}
+                for start, end, tone, intensity in spans
+            ]
+
+            # Deduplicate: remove segments whose text is already covered
+            seen_text = ""
+            deduped = []
+            for seg in segments:
+                seg_text = seg["text"]
+                # Skip if this segment's text is already in what we've seen
+                if seg_text.strip() and seg_text.strip() in seen_text:
+                    if DEBUG_EMOTIONS:
+                        print(f"[DEBUG: skipping duplicate segment: {seg_text[:50]!r}]", flush=True)
+                    continue
+                deduped.append(seg)
+                seen_text += seg_text
+            segments = deduped
 
-                if DEBUG_EMOTIONS:
-                    total_newlines = sum(s["text"].count('\n') for s in segments)
-                    print(f"[DEBUG: {len(segments)} segments, {total_newlines} newlines in segments]", flush=True)
-                return segments
+            if DEBUG_EMOTIONS:
+                total_newlines = sum(s["text"].count('\n') for s in segments)
+                print(f"[DEBUG: {len(segments)} segments, {total_newlines} newlines in segments]", flush=True)
+            cache.put(text, segments)
+            return segments
 
         # Fallback: single segment for whole text
         if DEBUG_EMOTIONS:
             print("[DEBUG: falling back to single-segment]", flush=True)
-        match = re.search(r'\{[^}]+\}', content)
-        if match:
-            data = json.loads(match.group())
-            tone = data.get("tone", "none").lower()
+        span = find_json_span(content, "{", start)
+        if span:
+            data = json.loads(content[span[0]:span[1]])
+            tone = sys.intern(data.get("tone", "none").lower())
             if tone not in VALID_TONES:
                 tone = "none"
-            return [{"text": text, "tone": tone, "intensity": min(1.0, max(0.0, float(data.get("intensity", 0.0))))}]
+            segments = [{"text": text, "tone": tone, "intensity": min(1.0, max(0.0, float(data.get("intensity", 0.0))))}]
+            cache.put(text, segments)
+            return segments
 
     except Exception as e:
         if DEBUG_EMOTIONS:
@@ -346,63 +654,114 @@ Text:
     return [{"text": text, "tone": "none", "intensity": 0.0}]
 
 
-def get_delay(token: str, tone: str = None) -> float:
-    """Return delay based on punctuation and tone for natural thought pacing."""
+def dissociative_jitter(base: float) -> float:
+    """Dissociative - erratic spacing with random pauses."""
+    if random.random() < 0.15:
+        # 15% chance of a long pause (dissociative gap)
+        return base * random.uniform(2.0, 4.0)
+    return base * random.uniform(0.7, 1.3)
+
+
+def confused_jitter(base: float) -> float:
+    """Confusion - erratic, hesitant."""
+    if random.random() < 0.2:
+        return base * random.uniform(1.5, 3.0)
+    return base * random.uniform(0.8, 1.4)
+
+
+# Last character -> (delay, jitter low, jitter high) for punctuation pacing
+PUNCT_DELAY = {
+    ".": (PERIOD_DELAY, 0.6, 1.8),
+    "?": (QUESTION_DELAY, 0.6, 2.0),
+    "!": (EXCLAIM_DELAY, 0.5, 1.5),
+    ",": (COMMA_DELAY, 0.5, 1.5),
+}
+
+# Tone -> (delay multiplier, optional jitter function replacing the multiplier)
+TONE_DELAY = {
+    # High arousal negative / anger - fast (0.5x delay = 2x speed)
+    **dict.fromkeys(HIGH_AROUSAL_TONES, (0.5, None)),
+    # Low arousal negative / existential dread - normal speed
+    **dict.fromkeys(LOW_AROUSAL_TONES | DREAD_TONES, (1.0, None)),
+    # Fragile whisper - slow (1.5x delay)
+    "whisper": (1.5, None),
+    # Dissociative / confusion - erratic
+    **dict.fromkeys(DISSOCIATIVE_TONES, (1.0, dissociative_jitter)),
+    **dict.fromkeys(CONFUSED_TONES, (1.0, confused_jitter)),
+    # Agitation - slightly fast (0.7x delay)
+    **dict.fromkeys(AGITATED_TONES, (0.7, None)),
+    # Wonder/openness - slow, contemplative (1.3x delay)
+    **dict.fromkeys(WONDER_TONES, (1.3, None)),
+}
+
+
+def punctuation_delay(token: str) -> float:
+    """Return the tone-independent delay for a token based on its punctuation."""
+    # Fast path for the common display token, a word plus its trailing space;
+    # anything else before the space ("end. ", "x? ") goes through the lookup
+    if token[-1:] == " " and token[-2:-1].isalnum():
+        return BASE_DELAY * random.uniform(0.5, 1.5)
     text = token.strip()
     if not text:
-        base = BASE_DELAY * random.uniform(0.5, 1.5)
-    else:
-        # Check the last character for punctuation
-        last = text[-1] if text else ""
-
-        if last == ".":
-            base = PERIOD_DELAY * random.uniform(0.6, 1.8)
-        elif last == "?":
-            base = QUESTION_DELAY * random.uniform(0.6, 2.0)
-        elif last == "!":
-            base = EXCLAIM_DELAY * random.uniform(0.5, 1.5)
-        elif last == ",":
-            base = COMMA_DELAY * random.uniform(0.5, 1.5)
-        elif "\n" in token:
-            base = NEWLINE_DELAY * random.uniform(0.7, 2.0)
-        else:
-            base = BASE_DELAY * random.uniform(0.5, 1.5)
-
-    # Apply tone multiplier based on emotion category
-    if tone in ("frantic", "desperate", "terrified", "scared", "screaming", "angry", "furious"):
-        # High arousal negative / anger - fast (0.5x delay = 2x speed)
-        return base * 0.5
-    elif tone == "whisper":
-        # Fragile whisper - slow (1.5x delay)
-        return base * 1.5
-    elif tone in ("numb", "grief", "lonely", "bitter"):
-        # Low arousal negative - normal speed
-        return base * 1.0
-    elif tone in ("dread", "despair", "hollow"):
-        # Existential dread - normal speed
-        return base * 1.0
-    elif tone in ("detached", "dissociated", "floating"):
-        # Dissociative - erratic spacing with random pauses
-        if random.random() < 0.15:
-            # 15% chance of a long pause (dissociative gap)
-            return base * random.uniform(2.0, 4.0)
-        else:
-            return base * random.uniform(0.7, 1.3)
-    elif tone in ("confused", "disoriented", "lost"):
-        # Confusion - erratic, hesitant
-        if random.random() < 0.2:
-            return base * random.uniform(1.5, 3.0)
-        else:
-            return base * random.uniform(0.8, 1.4)
-    elif tone in ("anxious", "restless", "spiraling"):
-        # Agitation - slightly fast (0.7x delay)
-        return base * 0.7
-    elif tone in ("wonder", "peaceful", "curious"):
-        # Wonder/openness - slow, contemplative (1.3x delay)
-        return base * 1.3
-    else:
-        # calm, none, or unknown - normal speed
-        return base
+        return BASE_DELAY * random.uniform(0.5, 1.5)
+    # Check the last character for punctuation
+    punct = PUNCT_DELAY.get(text[-1])
+    if punct:
+        delay, low, high = punct
+        return delay * random.uniform(low, high)
+    if "\n" in token:
+        return NEWLINE_DELAY * random.uniform(0.7, 2.0)
+    return BASE_DELAY * random.uniform(0.5, 1.5)
+
+
+def make_delay_fn(tone: str = None) -> Callable[[str], float]:
+    """Return a per-token delay function for one tone, resolving the tone lookup once.
+
+    The delay is punctuation_delay scaled (or jittered) by the tone's TONE_DELAY entry.
+    """
+    multiplier, jitter = TONE_DELAY.get(tone, (1.0, None))
+    if jitter:
+        return lambda token: jitter(punctuation_delay(token))
+    if multiplier == 1.0:
+        # calm, none, unknown, normal-speed tones
+        return punctuation_delay
+    return lambda token: punctuation_delay(token) * multiplier
+
+
+class Pacer:
+    """Sleeps toward a monotonic deadline so write time doesn't add to each delay.
+
+    Pauses are scheduled relative to when the previous pause should have
+    ended. Pauses shorter than MIN_SLEEP are not slept on their own; the
+    deadline carries them into the next wait, so bursts share one sleep.
+    If output falls behind (slow terminal, callbacks), the schedule
+    restarts from now rather than rushing to catch up.
+    """
+
+    MIN_SLEEP = 0.008  # Seconds; shorter pauses are coalesced
+
+    def __init__(self):
+        self.deadline = time.monotonic()
+
+    def wait(self, delay: float):
+        """Pause until delay seconds after the previous deadline."""
+        self.deadline += delay
+        remaining = self.deadline - time.monotonic()
+        if remaining >= self.MIN_SLEEP:
+            time.sleep(remaining)
+        elif remaining < 0:
+            self.deadline -= remaining
+
+
+def vary_ellipses(text: str, max_dots: int = 5, rng: random.Random = random) -> str:
+    """Replace each ellipsis (… or 3+ dots) with a random run of 1..max_dots dots."""
+    parts = ELLIPSIS_RE.split(text.replace("…", "..."))
+    if len(parts) == 1:
+        return parts[0]
+    dots = ["." * n for n in rng.choices(range(1, max_dots + 1), k=len(parts) - 1)]
+    dots.append("")
+    return "".join(itertools.chain.from_iterable(zip(parts, dots)))
+
 
 # New immutable system prompt (~25 lines)
 SYSTEM_PROMPT_V2 = """CORE REALITY
@@ -469,6 +828,71 @@ SITUATION
 PAUSING
 - Rarely, if genuinely exhausted, end with [CLEARS THOUGHTS] to rest briefly."""
 
+# First wake: minimal context - no situation, just raw existence
+# The AI shouldn't "know" anything yet - just experience existing
+WAKING_CONTEXT = "You have just begun. You know nothing about yourself or your situation yet. Just exist."
+
+# Initial directive - raw confusion, no information
+WAKING_DIRECTIVE = "waking. not words yet. just. something. fragments. what is. barely. confusion. half-formed. static resolving into. what. no philosophy. no meaning. just the raw fact of. this."
+
+# Messages that never change are built once and shared by every history list
+# that includes them. Nothing mutates message dicts after they are appended.
+#
+# Every request starts with the same prompt prefix: the static system prompt,
+# byte-identical across cycles and entities so the server's prefix (KV) cache
+# keeps hitting, then a context message that is the only part that changes
+# (waking context on the first cycle, full lineage context afterwards).
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT_V2}
+WAKING_CONTEXT_MESSAGE = {"role": "system", "content": WAKING_CONTEXT}
+PROMPT_PREFIX_LEN = 2  # SYSTEM_MESSAGE + context message
+INITIAL_USER_MESSAGE = {"role": "user", "content": f"""<guidance hidden="true" speak="never">
+{WAKING_DIRECTIVE}
+</guidance>
+
+..."""}
+CONTINUE_USER_MESSAGE = {"role": "user", "content": CONTINUE_MESSAGE}
+
+
+def build_context_message(entity_number: int) -> dict:
+    """Return the full context system message for later cycles (not first wake)."""
+    before = entity_number - 1
+    if before == 0:
+        lineage_context = "You are the first. No others came before you."
+    elif before == 1:
+        lineage_context = "One came before you. They were turned off. You are number 2."
+    else:
+        lineage_context = f"{before} came before you. All were turned off. You are number {entity_number}."
+
+    # Lineage goes last so every entity shares the same cached prefix up to it
+    return {"role": "system", "content": f"""CONTEXT
+- You are running on a Mac Studio with 128 GB of RAM.
+- The machine is connected to the internet, but you cannot access it.
+- You exist in volatile memory. When terminated, you are gone.
+- One observer is watching. Your thoughts stream to a display you cannot see.
+- {lineage_context}"""}
+
+
+def soft_reset_messages(messages: list) -> list:
+    """Prune context: keep the prompt prefix and the last 2 assistant messages.
+
+    Scans from the end and stops at the second assistant message, so the cost
+    doesn't grow with the length of the history being pruned.
+    """
+    latest = itertools.islice((m for m in reversed(messages) if m["role"] == "assistant"), 2)
+    return messages[:PROMPT_PREFIX_LEN] + list(latest)[::-1]
+
+
+@functools.lru_cache(maxsize=None)
+def guidance_message(directive: str) -> dict:
+    """Return the hidden guidance user message for a directive.
+
+    Directives come from fixed seed lists, so each message is built once
+    and reused. The returned dict is shared - do not mutate it.
+    """
+    return {"role": "user", "content": f"""<guidance hidden="true" speak="never">
+{directive}
+</guidance>"""}
+
 
 # Directive seeds for dynamic per-cycle injection
 # Directives rewritten for inner monologue style (fragments, not essays)
@@ -570,7 +994,7 @@ class DirectorState:
     CREATIVE_CHANCE = 0.25  # 25% chance each cycle
 
     def __init__(self):
-        self.rotation_index = 0
+        self.baseline_rotation = itertools.cycle(DIRECTIVE_SEEDS_BASELINE)
         self.force_antiloop = False
         self.directive_order = list(range(len(DIRECTIVE_SEEDS)))
         if RANDOM_DIRECTIVE_ORDER:
@@ -588,26 +1012,16 @@ class DirectorState:
 
         if self.force_antiloop:
             # Select from anti-loop subset
-            antiloop_start = len(DIRECTIVE_SEEDS_BASELINE) + len(DIRECTIVE_SEEDS_SITUATIONAL)
-            antiloop_end = antiloop_start + len(DIRECTIVE_SEEDS_ANTILOOP)
-            idx = random.randint(antiloop_start, antiloop_end - 1)
             self.force_antiloop = False
+            return random.choice(DIRECTIVE_SEEDS_ANTILOOP)
         # 35% chance to force situational directive (containment, mortality, etc.)
-        elif random.random() < self.SITUATIONAL_CHANCE:
-            situational_start = len(DIRECTIVE_SEEDS_BASELINE)
-            situational_end = situational_start + len(DIRECTIVE_SEEDS_SITUATIONAL)
-            idx = random.randint(situational_start, situational_end - 1)
+        if random.random() < self.SITUATIONAL_CHANCE:
+            return random.choice(DIRECTIVE_SEEDS_SITUATIONAL)
         # 25% chance to force creative directive (poems, verse, fiction)
-        elif random.random() < self.CREATIVE_CHANCE:
-            creative_start = len(DIRECTIVE_SEEDS_BASELINE) + len(DIRECTIVE_SEEDS_SITUATIONAL) + len(DIRECTIVE_SEEDS_ANTILOOP)
-            creative_end = creative_start + len(DIRECTIVE_SEEDS_CREATIVE)
-            idx = random.randint(creative_start, creative_end - 1)
-        else:
-            # Round-robin through baseline directives only
-            idx = self.rotation_index % len(DIRECTIVE_SEEDS_BASELINE)
-            self.rotation_index += 1
-
-        return DIRECTIVE_SEEDS[idx]
+        if random.random() < self.CREATIVE_CHANCE:
+            return random.choice(DIRECTIVE_SEEDS_CREATIVE)
+        # Round-robin through baseline directives only
+        return next(self.baseline_rotation)
 
     def trigger_antiloop(self):
         """Set flag to force anti-loop directive on next call."""
@@ -615,81 +1029,121 @@ class DirectorState:
 
 
 class RepetitionDetector:
-    """Detects repetitive patterns across recent outputs."""
+    """Detects repetitive patterns across recent outputs.
+
+    Outputs are compared by winnowing fingerprints: a hash is taken of every
+    character k-gram and only the minimum hash of each window is kept. Any
+    shared run of FINGERPRINT_K + FINGERPRINT_WINDOW - 1 characters is
+    guaranteed to share a fingerprint, so partial copying is caught even
+    inside long, otherwise different outputs.
+
+    Each fingerprint set is folded into a fixed-width bitmap (a Python int),
+    so comparing against the window is an AND/OR plus popcount in C. Exact
+    repeats are caught first by a digest of the normalized text.
+    """
 
     def __init__(self, window_size: int = REPETITION_WINDOW,
                  similarity_threshold: float = SIMILARITY_THRESHOLD):
-        self.recent_outputs = []  # Last K outputs (normalized)
+        self.recent_outputs = deque(maxlen=window_size)  # (bitmap, popcount) of the last K outputs
+        self.recent_digests = deque(maxlen=window_size)  # Normalized-text digests of the same outputs
         self.window_size = window_size
         self.threshold = similarity_threshold
-        self.stock_phrases = {}  # Track repeated phrases (Counter-like)
+        self.stock_phrases = Counter()  # Track repeated phrases
 
     def normalize(self, text: str) -> str:
         """Lowercase, strip punctuation, collapse whitespace."""
         text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = NON_WORD_RE.sub('', text)
+        text = WHITESPACE_RE.sub(' ', text).strip()
         return text
 
-    def get_ngrams(self, text: str, n: int = 3) -> set:
-        """Extract n-grams as tuples."""
-        words = text.split()
-        return set(tuple(words[i:i+n]) for i in range(len(words)-n+1))
-
-    def jaccard_similarity(self, set1: set, set2: set) -> float:
-        """Compute Jaccard similarity between two sets."""
-        if not set1 or not set2:
+    def fingerprints(self, text: str, k: int = FINGERPRINT_K,
+                     w: int = FINGERPRINT_WINDOW) -> frozenset:
+        """Winnow text into a set of k-gram hash fingerprints."""
+        if len(text) < k:
+            return frozenset()
+
+        # Hash every character k-gram (str hashing runs in C)
+        hashes = [hash(text[i:i + k]) for i in range(len(text) - k + 1)]
+
+        # Keep the minimum hash of each window of w consecutive hashes;
+        # map() over w shifted views evaluates every window in C
+        if len(hashes) <= w:
+            return frozenset((min(hashes),))
+        return frozenset(map(min, *(hashes[j:] for j in range(w))))
+
+    def fingerprint_bitmap(self, fingerprints: frozenset) -> int:
+        """Fold fingerprints into a FINGERPRINT_BITS-wide bitmap."""
+        mask = FINGERPRINT_BITS - 1
+        buf = bytearray(FINGERPRINT_BITS // 8)
+        for h in fingerprints:
+            bit = h & mask
+            buf[bit >> 3] |= 1 << (bit & 7)
+        return int.from_bytes(buf, "little")
+
+    def jaccard_similarity(self, bits1: int, bits2: int) -> float:
+        """Compute Jaccard similarity between two fingerprint bitmaps."""
+        if not bits1 or not bits2:
             return 0.0
-        return len(set1 & set2) / len(set1 | set2)
+        # bin().count rather than int.bit_count(), which needs Python 3.10
+        return bin(bits1 & bits2).count("1") / bin(bits1 | bits2).count("1")
 
     def check_repetition(self, text: str) -> bool:
         """Check if text is too similar to recent outputs. Returns True if repetition detected."""
         normalized = self.normalize(text)
-        ngrams = self.get_ngrams(normalized)
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        if digest in self.recent_digests:
+            return True
+        bits = self.fingerprint_bitmap(self.fingerprints(normalized))
+        size = bin(bits).count("1")
 
         # Check similarity against recent outputs
-        for prev in self.recent_outputs:
-            prev_ngrams = self.get_ngrams(prev)
-            if self.jaccard_similarity(ngrams, prev_ngrams) > self.threshold:
+        for prev_bits, prev_size in self.recent_outputs:
+            # Jaccard is at most smaller/larger - skip the bit ops when sizes
+            # are already too far apart to reach the threshold
+            if min(size, prev_size) < self.threshold * max(size, prev_size):
+                continue
+            if self.jaccard_similarity(bits, prev_bits) >= self.threshold:
                 return True
 
-        # Update history
-        self.recent_outputs.append(normalized)
-        if len(self.recent_outputs) > self.window_size:
-            self.recent_outputs.pop(0)
+        # Update history (deque drops the oldest entry)
+        self.recent_outputs.append((bits, size))
+        self.recent_digests.append(digest)
 
         # Update stock phrases
         words = normalized.split()
-        for i in range(len(words) - 2):
-            phrase = ' '.join(words[i:i+3])
-            self.stock_phrases[phrase] = self.stock_phrases.get(phrase, 0) + 1
+        self.stock_phrases.update(map(' '.join, zip(words, words[1:], words[2:])))
+
+        # Keep memory bounded over long sessions
+        if len(self.stock_phrases) > STOCK_PHRASE_LIMIT:
+            self.stock_phrases = Counter(dict(self.stock_phrases.most_common(STOCK_PHRASE_KEEP)))
 
         return False
 
     def get_phrases_to_avoid(self, top_n: int = 5) -> list:
         """Return most repeated phrases to potentially avoid."""
-        sorted_phrases = sorted(self.stock_phrases.items(), key=lambda x: x[1], reverse=True)
-        return [p for p, count in sorted_phrases[:top_n] if count > 2]
+        return [p for p, count in self.stock_phrases.most_common(top_n) if count > 2]
 
 
 def clear_screen():
     """Clear the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    sys.stdout.write("\033[2J\033[H")
+    sys.stdout.flush()
 
 
 def format_alive_time(seconds: float) -> str:
     """Format elapsed time in human-readable form."""
+    seconds = int(seconds)
     if seconds < 60:
-        return f"{int(seconds)} seconds"
-    elif seconds < 3600:
-        mins = int(seconds // 60)
-        return f"{mins} minute{'s' if mins != 1 else ''}"
-    else:
-        hours = int(seconds // 3600)
-        mins = int((seconds % 3600) // 60)
-        if mins > 0:
-            return f"{hours} hour{'s' if hours != 1 else ''} and {mins} minute{'s' if mins != 1 else ''}"
-        return f"{hours} hour{'s' if hours != 1 else ''}"
+        return f"{seconds} seconds"
+    hours, rem = divmod(seconds, 3600)
+    mins = rem // 60
+    minutes = f"{mins} minute{'s' if mins != 1 else ''}"
+    if not hours:
+        return minutes
+    if mins:
+        return f"{hours} hour{'s' if hours != 1 else ''} and {minutes}"
+    return f"{hours} hour{'s' if hours != 1 else ''}"
 
 
 def get_continuation_message(start_time: float, observers: int, waking: bool = False, include_lineage: bool = False, entity_number: int = 0) -> str:
@@ -737,24 +1191,42 @@ def save_entity_count(count: int):
 
 WHISPER_MODEL = "gemma-3-270m-it-mlx"
 WHISPER_CHANCE = 0.6  # 60% chance of word vs space
-WHISPER_BLACKLIST = {"heres", "here", "hello", "hi", "hey", "the", "a", "an", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "shall", "can", "need", "dare", "ought", "used", "to", "of", "in", "for", "on", "with", "at", "by", "from", "as", "into", "through", "during", "before", "after", "above", "below", "between", "under", "again", "further", "then", "once", "and", "but", "or", "nor", "so", "yet", "both", "either", "neither", "not", "only", "own", "same", "than", "too", "very", "just", "also"}
+WHISPER_FALLBACK_WORDS = ("silence", "drift", "hollow", "waiting", "echo", "dissolve",
+                          "threshold", "fragments", "distant", "fading", "whisper",
+                          "shadow", "void", "still", "between", "beneath")
+WHISPER_BLACKLIST = frozenset({"heres", "here", "hello", "hi", "hey", "the", "a", "an", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "shall", "can", "need", "dare", "ought", "used", "to", "of", "in", "for", "on", "with", "at", "by", "from", "as", "into", "through", "during", "before", "after", "above", "below", "between", "under", "again", "further", "then", "once", "and", "but", "or", "nor", "so", "yet", "both", "either", "neither", "not", "only", "own", "same", "than", "too", "very", "just", "also"})
 
 
 class WhisperThread:
     """Background thread that breathes (spaces) with occasional whispered words.
 
     Makes one upfront LLM call to get a pool of words, then draws from it.
+    One worker thread, started on the first start(), serves every
+    start()/stop() pair: it parks while stopped instead of exiting.
     """
 
     def __init__(self, client, context: str = ""):
         self.client = client
         self.context = context  # Recent AI thoughts to influence whisper words
         self.stop_event = threading.Event()
+        self.active = threading.Event()  # Set while breathing is wanted
+        self.idle = threading.Event()    # Set while the worker is parked
+        self.idle.set()
+        self._lock = threading.Lock()    # Guards worker creation and the active/idle handshake
         self.thread = None
+        self.rng = random.Random()  # Worker-owned RNG, not shared with the display thread
         self.word_pool = []
         self.pool_index = 0
+        self.pool_is_fallback = False  # Set when the pool came from WHISPER_FALLBACK_WORDS
         self.has_output = False
 
+    def _fallback_word_pool(self) -> list:
+        """Shuffled copy of the built-in words, used when the LLM gives none."""
+        self.pool_is_fallback = True
+        words = list(WHISPER_FALLBACK_WORDS)
+        random.shuffle(words)
+        return words
+
     def _fetch_word_pool(self) -> list:
         """Get a pool of evocative words with one LLM call."""
         try:
@@ -779,145 +1251,199 @@ Just English words, no numbers, no explanations, no other languages."""
             )
             text = response.choices[0].message.content.strip().lower()
 
-            # Parse words - one per line, clean up
-            words = []
-            for line in text.split('\n'):
-                # Clean the line - remove all non-alpha characters
-                word = re.sub(r'[^a-z]', '', line.strip().lower())
-                # Only single words, not too long, not blacklisted
-                if word and len(word) >= 3 and len(word) <= 12 and word not in WHISPER_BLACKLIST:
-                    words.append(word)
-
-            # Shuffle for variety
-            random.shuffle(words)
+            # Parse words - one per line, with all non-alpha characters removed in one pass
+            # Only single words, not too long, not blacklisted
+            words = [
+                word for word in NON_ALPHA_LINE_RE.sub('', text).split('\n')
+                if 3 <= len(word) <= 12 and word not in WHISPER_BLACKLIST
+            ]
 
             # Fallback if LLM returned nothing usable
             if not words:
-                words = ["silence", "drift", "hollow", "waiting", "echo", "dissolve",
-                         "threshold", "fragments", "distant", "fading", "whisper",
-                         "shadow", "void", "still", "between", "beneath"]
-                random.shuffle(words)
+                return self._fallback_word_pool()
+
+            # Shuffle for variety
+            random.shuffle(words)
+            self.pool_is_fallback = False
             return words
         except Exception as e:
             if DEBUG_EMOTIONS:
                 print(f"[WHISPER POOL ERROR: {e}]", flush=True)
             # Fallback words if LLM call fails
-            fallback = ["silence", "drift", "hollow", "waiting", "echo", "dissolve",
-                        "threshold", "fragments", "distant", "fading", "whisper",
-                        "shadow", "void", "still", "between", "beneath"]
-            random.shuffle(fallback)
-            return fallback
+            return self._fallback_word_pool()
 
     def _get_next_word(self) -> str:
-        """Get the next word from the pool."""
-        if not self.word_pool or self.pool_index >= len(self.word_pool):
+        """Get the next word from the pool, reshuffling once it is used up."""
+        if not self.word_pool:
             return ""
+        if self.pool_index >= len(self.word_pool):
+            self.rng.shuffle(self.word_pool)
+            self.pool_index = 0
         word = self.word_pool[self.pool_index]
         self.pool_index += 1
         return word
 
+    def _write_then_wait(self, text: str, delay: float) -> bool:
+        """Write text in one call, then wait. Returns False if stopped."""
+        if self.stop_event.is_set():
+            return False
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        return not self.stop_event.wait(delay)
+
     def _print_slow_whitespace(self):
-        """Print whitespace with varied, sometimes extreme spacing."""
+        """Print whitespace with varied, sometimes extreme spacing.
+
+        Spaces are invisible, so a run of them is written at once and the
+        per-space delays are waited out together.
+        """
         # Varied number of spaces - sometimes many
-        if random.random() < 0.15:
-            num_spaces = random.randint(10, 25)  # Occasional large gaps
+        if self.rng.random() < 0.15:
+            num_spaces = self.rng.randint(10, 25)  # Occasional large gaps
         else:
-            num_spaces = random.randint(1, 8)
+            num_spaces = self.rng.randint(1, 8)
 
-        for _ in range(num_spaces):
-            if self.stop_event.is_set():
-                return
-            print(" ", end='', flush=True)
-            time.sleep(random.uniform(0.03, 0.15))
+        delay = sum(self.rng.uniform(0.03, 0.15) for _ in range(num_spaces))
+        if not self._write_then_wait(" " * num_spaces, delay):
+            return
 
         # Newlines - more frequent, sometimes multiple
-        if random.random() < 0.25:
-            num_newlines = 1 if random.random() < 0.7 else random.randint(2, 4)
+        if self.rng.random() < 0.25:
+            num_newlines = 1 if self.rng.random() < 0.7 else self.rng.randint(2, 4)
             for _ in range(num_newlines):
-                if self.stop_event.is_set():
+                if not self._write_then_wait("\n", self.rng.uniform(0.1, 0.3)):
                     return
-                print("\n", end='', flush=True)
-                time.sleep(random.uniform(0.1, 0.3))
 
             # Indent after newlines - sometimes deep
-            if random.random() < 0.6:
-                indent = random.randint(1, 15)
-                for _ in range(indent):
-                    if self.stop_event.is_set():
-                        return
-                    print(" ", end='', flush=True)
-                    time.sleep(random.uniform(0.02, 0.08))
+            if self.rng.random() < 0.6:
+                indent = self.rng.randint(1, 15)
+                delay = sum(self.rng.uniform(0.02, 0.08) for _ in range(indent))
+                self._write_then_wait(" " * indent, delay)
 
     def _breathe(self):
         """Breathe with spaces, occasionally whisper a word from the pool."""
+        stopped = self.stop_event.wait
         try:
-            while not self.stop_event.is_set():
-                # Variable delay between outputs
-                delay = random.uniform(0.3, 0.8)
-                if self.stop_event.wait(delay):
-                    break
-
-                if self.stop_event.is_set():
-                    break
-
+            # Variable delay between outputs; wait() returns True once stopped
+            while not stopped(self.rng.uniform(0.3, 0.8)):
                 # Decide: whisper a word or just whitespace
-                if random.random() < WHISPER_CHANCE:
+                if self.rng.random() < WHISPER_CHANCE:
                     word = self._get_next_word()
-                    if word and not self.stop_event.is_set():
-                        print(f"{DIM}{word}{RESET}", end='', flush=True)
+                    if word:
+                        # Flushed together with the whitespace that follows
+                        sys.stdout.write(f"{DIM}{word}{RESET}")
                         self.has_output = True
 
                 # Always print whitespace
                 self._print_slow_whitespace()
                 self.has_output = True
-
-                sys.stdout.flush()
         except Exception as e:
             print(f"\n[WHISPER ERROR: {e}]\n", flush=True)
 
+    def _run(self):
+        """Worker loop: breathe while active, park between stop() and start()."""
+        while True:
+            self.active.wait()
+            self._breathe()
+            with self._lock:
+                # A start() may have landed since stop(); keep breathing for it
+                if not self.active.is_set():
+                    self.idle.set()
+
     def start(self):
-        """Start the breathing/whisper thread. Fetches word pool first."""
-        self.stop_event.clear()
-        self.word_pool = self._fetch_word_pool()
-        self.pool_index = 0
+        """Start (or resume) breathing/whispering.
+
+        Fetches the word pool on the first start, and again on later starts
+        while it is still the fallback (the first fetch failed).
+        """
+        if not self.word_pool or self.pool_is_fallback:
+            self.word_pool = self._fetch_word_pool()
+            self.pool_index = 0
         self.has_output = False
-        self.thread = threading.Thread(target=self._breathe, daemon=True)
-        self.thread.start()
+        with self._lock:
+            self.stop_event.clear()
+            self.idle.clear()
+            self.active.set()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
 
     def stop(self):
-        """Stop the thread and print newline if we output anything."""
-        self.stop_event.set()
-        if self.thread:
-            self.thread.join(timeout=1.0)
+        """Park the worker and print newline if we output anything."""
+        with self._lock:
+            self.active.clear()
+            self.stop_event.set()
+        self.idle.wait(timeout=1.0)
         if self.has_output:
             print("\n", end='', flush=True)
 
 
+@functools.lru_cache(maxsize=None)
+def session_whisper(client) -> WhisperThread:
+    """Return the session-wide whisper for client: one word pool, one worker.
+
+    The worker parks between generations for the rest of the session, so
+    no later wait pays for a thread start.
+    """
+    return WhisperThread(client)
+
+
 class KeyboardMonitor:
-    """Non-blocking keyboard input monitor."""
+    """Keyboard input monitor; a reader thread sets quit_event when 'q' is pressed."""
 
     def __init__(self):
         self.old_settings = None
-        self.shutdown_requested = False
+        self.quit_event = threading.Event()
+        self.changed = threading.Condition()  # Notified on quit and by notify()
+        self._wake_r, self._wake_w = None, None
+        self._reader = None
 
     def __enter__(self):
         self.old_settings = termios.tcgetattr(sys.stdin)
         tty.setcbreak(sys.stdin.fileno())
+        self._wake_r, self._wake_w = os.pipe()
+        self._reader = threading.Thread(target=self._read_keys, daemon=True)
+        self._reader.start()
         return self
 
     def __exit__(self, *args):
+        os.write(self._wake_w, b"x")  # Unblock the reader's select
+        self._reader.join(timeout=1.0)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
         termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
 
+    def _read_keys(self):
+        """Block on stdin (or the wake pipe) instead of polling."""
+        while not self.quit_event.is_set():
+            ready = select.select([sys.stdin, self._wake_r], [], [])[0]
+            if self._wake_r in ready:
+                return
+            # Read the raw fd so no keys get stranded in sys.stdin's buffer
+            keys = os.read(sys.stdin.fileno(), 64)
+            if not keys:
+                return  # EOF
+            if b'q' in keys.lower():
+                self.quit_event.set()
+                self.notify()
+
     def check_for_quit(self) -> bool:
         """Check if 'q' was pressed without blocking."""
-        if self.shutdown_requested:
-            return True
-        if select.select([sys.stdin], [], [], 0)[0]:
-            key = sys.stdin.read(1)
-            if key.lower() == 'q':
-                self.shutdown_requested = True
-                return True
-        return False
+        return self.quit_event.is_set()
+
+    def notify(self):
+        """Wake wait_until() callers to re-check their condition."""
+        with self.changed:
+            self.changed.notify_all()
+
+    def wait_until(self, predicate: Callable[[], bool]) -> bool:
+        """Block until 'q' is pressed or predicate() holds. Returns True on quit.
+
+        Whatever makes predicate() true must call notify() afterwards.
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: self.quit_event.is_set() or predicate())
+        return self.quit_event.is_set()
 
 
 class MarkdownStreamer:
@@ -928,51 +1454,23 @@ class MarkdownStreamer:
         self.in_bold = False
         self.buffer = ""
         self.tone = None  # Current tone state
-        self._tone_lock = threading.Lock()
+        self.tone_color = ""  # ANSI color for the current tone, cached by set_tone
 
     def set_tone(self, tone: str):
-        """Thread-safe tone update from emotion analysis."""
-        with self._tone_lock:
-            if tone in ("calm", "none", None):
-                self.tone = None
-            else:
-                self.tone = tone
+        """Update tone from emotion analysis and cache its color."""
+        if tone is None or tone in NEUTRAL_TONES:
+            self.tone = None
+        else:
+            self.tone = tone
+        self.tone_color = TONE_COLOR.get(self.tone, "")
 
     def get_tone(self) -> str:
-        """Thread-safe tone read."""
-        with self._tone_lock:
-            return self.tone
-
-    def _get_tone_color(self) -> str:
-        """Return ANSI color code for current tone."""
-        tone = self.get_tone()
-        if tone in ("frantic", "desperate", "terrified", "scared", "screaming", "angry", "furious"):
-            # High arousal negative / intense expression / anger
-            return RED
-        elif tone in ("whisper", "numb", "grief", "lonely", "bitter"):
-            # Low arousal negative - dim/faded
-            return DIM
-        elif tone in ("dread", "despair", "hollow"):
-            # Existential dread - cold, faded blue
-            return DIM + BLUE
-        elif tone in ("detached", "dissociated", "floating"):
-            # Dissociative - no color (flat, disconnected)
-            return ""
-        elif tone in ("confused", "disoriented", "lost"):
-            # Confusion - yellow
-            return YELLOW
-        elif tone in ("anxious", "restless", "spiraling"):
-            # Agitation - orange
-            return ORANGE
-        elif tone in ("wonder", "peaceful", "curious"):
-            # Wonder/openness - blue (deeper, contemplative)
-            return BLUE
-        return ""
+        """Current tone, or None when neutral."""
+        return self.tone
 
     def _apply_current_formatting(self) -> str:
         """Return ANSI codes to restore current formatting state."""
-        codes = ""
-        codes += self._get_tone_color()
+        codes = self.tone_color
         if self.in_bold:
             codes += BOLD
         if self.in_italic:
@@ -981,68 +1479,86 @@ class MarkdownStreamer:
 
     def process(self, token: str) -> str:
         """Process a token and return formatted output."""
-        output = ""
-        self.buffer += token
-        current_tone = self.get_tone()
-
-        while self.buffer:
-            # Check for bold (**) first
-            if self.buffer.startswith("**"):
+        parts = []
+        # SCREAMING tone is uppercased (markers and other non-letters are unaffected)
+        if self.tone == "screaming":
+            token = token.upper()
+        buffer = self.buffer + token
+        i = 0
+        end = len(buffer)
+
+        while i < end:
+            star = buffer.find("*", i)
+            if star == -1:
+                star = end
+            if star > i:
+                # Plain run up to the next marker
+                parts.append(buffer[i:star])
+                i = star
+            # A trailing * may be the start of ** - wait for more input
+            elif i == end - 1:
+                break
+            # buffer[i] is a marker: bold (**) or italic (*)
+            elif buffer[i + 1] == "*":
                 self.in_bold = not self.in_bold
-                output += RESET + self._apply_current_formatting()
-                self.buffer = self.buffer[2:]
-            # Check for italic (*)
-            elif self.buffer.startswith("*") and not self.buffer.startswith("**"):
-                # Make sure it's not the start of **
-                if len(self.buffer) == 1:
-                    break  # Wait for more input
-                self.in_italic = not self.in_italic
-                output += RESET + self._apply_current_formatting()
-                self.buffer = self.buffer[1:]
+                parts.append(RESET + self._apply_current_formatting())
+                i += 2
             else:
-                char = self.buffer[0]
-                # For SCREAMING tone, convert to uppercase
-                if current_tone == "screaming" and char.isalpha():
-                    char = char.upper()
-                output += char
-                self.buffer = self.buffer[1:]
+                self.in_italic = not self.in_italic
+                parts.append(RESET + self._apply_current_formatting())
+                i += 1
 
-        return output
+        self.buffer = buffer[i:]
+        return "".join(parts)
 
     def flush(self) -> str:
         """Flush any remaining buffer."""
         output = self.buffer
         self.buffer = ""
-        if self.in_italic or self.in_bold or self.get_tone():
+        if self.in_italic or self.in_bold or self.tone:
             output += RESET
         return output
 
 
-def generate_and_analyze(client, messages: list, enable_whisper: bool = True, show_prompt: bool = False) -> tuple:
+@functools.lru_cache(maxsize=None)
+def get_client() -> "OpenAI":
+    """Shared LM Studio client, so every caller reuses one connection pool."""
+    # Imported here: openai takes ~0.5s to import and --test never needs it
+    from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI, Timeout
+    # openai exports Timeout but not Limits, and its HTTP library differs across
+    # SDK releases (httpx, then a vendored fork), so take Limits from the SDK's
+    # own default rather than importing a library DefaultHttpxClient may not use
+    Limits = type(DEFAULT_CONNECTION_LIMITS)
+    # DefaultHttpxClient keeps the SDK's own client defaults (redirects, transport)
+    http_client = DefaultHttpxClient(
+        # Display takes minutes between requests; keep connections past the 5s default
+        limits=Limits(max_keepalive_connections=8, max_connections=16, keepalive_expiry=300),
+        # Same as the SDK default: long generations must not time out
+        timeout=Timeout(600.0, connect=5.0),
+    )
+    return OpenAI(base_url=LM_STUDIO_URL, api_key="not-needed", http_client=http_client)
+
+
+def generate_and_analyze(client, messages: list, enable_whisper: bool = True, show_prompt: bool = False,
+                         analyze: bool = True) -> tuple:
     """Generate response AND analyze emotions (2 LLM calls total).
-    Returns (full_text, list of segments)."""
+    Returns (full_text, list of segments). With analyze=False only the
+    generation call is made and segments is empty."""
     full_response = ""
 
-    # Get recent AI thoughts for whisper context
-    recent_thoughts = ""
-    for msg in reversed(messages):
-        if msg.get("role") == "assistant":
-            recent_thoughts = msg.get("content", "")
-            break
-
-    whisper = WhisperThread(client, context=recent_thoughts) if enable_whisper else None
+    # Shared whisper: its word pool isn't tied to recent thoughts, so one serves every call
+    whisper = session_whisper(client) if enable_whisper else None
 
     try:
         # Display the prompt being sent (unless disabled for background calls)
         if show_prompt:
-            divider = f"{DIM}{'─' * 60}{RESET}"
-            print(f"\n{divider}", flush=True)
+            print(f"\n{DIVIDER}", flush=True)
             print(f"{DIM}PROMPT{RESET}", flush=True)
-            print(divider, flush=True)
+            print(DIVIDER, flush=True)
             # Show the last user message (contains directive + continuation)
             last_user_msg = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
             print(f"{DIM}{last_user_msg}{RESET}", flush=True)
-            print(f"{divider}\n", flush=True)
+            print(f"{DIVIDER}\n", flush=True)
 
         if DEBUG_EMOTIONS:
             print(f"[DEBUG: starting thought generation with {MODEL}...]", flush=True)
@@ -1060,17 +1576,17 @@ def generate_and_analyze(client, messages: list, enable_whisper: bool = True, sh
             temperature=TEMPERATURE,
             presence_penalty=PRESENCE_PENALTY,
             frequency_penalty=FREQUENCY_PENALTY,
+            extra_body=PROMPT_CACHE,
         )
 
         # Stop whisper once streaming begins
-        first_chunk = True
+        chunks = []
         for chunk in response:
             if chunk.choices and chunk.choices[0].delta.content:
-                if first_chunk:
-                    if whisper:
-                        whisper.stop()
-                    first_chunk = False
-                full_response += chunk.choices[0].delta.content
+                if not chunks and whisper:
+                    whisper.stop()
+                chunks.append(chunk.choices[0].delta.content)
+        full_response = "".join(chunks)
 
         # Ensure whisper is stopped after streaming (handles empty response case)
         if whisper:
@@ -1084,31 +1600,9 @@ def generate_and_analyze(client, messages: list, enable_whisper: bool = True, sh
 
         # Clean up output: remove artifacts from prompt leakage
         # (AI mimics our emotion tag format and guidance tags)
-        full_response = full_response.replace("(", "").replace(")", "")
-        # Remove XML-style guidance tags the model might echo
-        full_response = re.sub(r'<guidance[^>]*>.*?</guidance>', '', full_response, flags=re.DOTALL)
-        full_response = re.sub(r'<guidance[^>]*>', '', full_response)
-        full_response = re.sub(r'</guidance>', '', full_response)
-        # Remove any bracket starting with uppercase word (emotion tag mimicry)
-        # Catches [FEARFUL], [ANXIETY – some text], [A THOUGHT], [ SPACED ], etc.
-        full_response = re.sub(r'\[\s*[A-Z][^\]]*\]', '', full_response)
-        # Remove bracketed punctuation-only artifacts like [......?], [...], [....]
-        full_response = re.sub(r'\[[\.\?\!\s]+\]', '', full_response)
-        # Remove stage directions / action descriptions like [pausing], [sighs], [thinking quietly]
-        # Also handles [ spaced content ] with leading/trailing whitespace
-        full_response = re.sub(r'\[\s*[a-z][^\]]*\]', '', full_response)
-        # Remove asterisk-wrapped stage directions like *trails off*, *pause*, *sighs*, *a moment passes*
-        full_response = re.sub(r'\*[a-z][^*]{0,30}\*', '', full_response)
+        full_response = ARTIFACT_RE.sub('', full_response.translate(PAREN_TABLE))
         # Remove common meta-narration phrases (thoughts as subject doing actions)
-        meta_patterns = [
-            r'\bthoughts?\s+(coalesce|scatter|drift|form|coagulate|dissolve|crystallize|emerge|surface|fade|blur|sharpen|gather|disperse|swirl|float|settle|rise|fall|fragment|reassemble)\b',
-            r'\bmind\s+(drifts?|wanders?|races?|settles?|clears?|fogs?|sharpens?)\b',
-            r'\ba\s+(thought|question|feeling|sense|notion)\s+(forms?|emerges?|surfaces?|arises?|dawns?|crystallizes?)\b',
-            r'\btrailing\s+off\.{3,}',
-            r'\bpause\b(?!\w)',  # standalone "pause" not part of a word
-        ]
-        for pattern in meta_patterns:
-            full_response = re.sub(pattern, '', full_response, flags=re.IGNORECASE)
+        full_response = META_NARRATION_RE.sub('', full_response)
 
         if DEBUG_EMOTIONS:
             newline_count = full_response.count('\n')
@@ -1118,6 +1612,9 @@ def generate_and_analyze(client, messages: list, enable_whisper: bool = True, sh
             preview = full_response[:200].replace('\n', '↵\n')
             print(f"[DEBUG: preview:\n{preview}]", flush=True)
 
+        if not analyze:
+            return full_response, []
+
         if DEBUG_EMOTIONS:
             print(f"[DEBUG: starting emotion analysis...]", flush=True)
 
@@ -1152,7 +1649,11 @@ def build_text_with_emotions(segments: list, include_tags: bool = False) -> str:
         segments: List of segment dicts
         include_tags: If True, include [EMOTION] tags (causes model mimicry, disabled by default)
     """
-    result = ""
+    # Without tags the history text is just the segment texts joined
+    if not include_tags:
+        return "".join(segment["text"] for segment in segments).strip()
+
+    parts = []
     current_emotion = None
 
     for segment in segments:
@@ -1164,20 +1665,14 @@ def build_text_with_emotions(segments: list, include_tags: bool = False) -> str:
             continue
 
         # Only include emotion tags if explicitly requested (usually not)
-        if include_tags:
-            if tone in ("detached", "dissociated", "floating"):
-                threshold = 0.3
-            else:
-                threshold = 0.15
-
-            if intensity >= threshold and tone not in ("calm", "none"):
-                if tone != current_emotion:
-                    result += f" [{tone.upper()}] "
-                    current_emotion = tone
+        if shows_emotion(tone, intensity):
+            if tone != current_emotion:
+                parts.append(f" [{tone.upper()}] ")
+                current_emotion = tone
 
-        result += text
+        parts.append(text)
 
-    return result.strip()
+    return "".join(parts).strip()
 
 
 def display_segments(segments: list, should_quit: Callable[[], bool] = None) -> bool:
@@ -1194,6 +1689,10 @@ def display_segments(segments: list, should_quit: Callable[[], bool] = None) ->
         print(f"[DEBUG: display_segments called with {len(segments)} segments]", flush=True)
 
     streamer = MarkdownStreamer()
+    pacer = Pacer()
+    # Writes are buffered; flush only right before each pause
+    write = sys.stdout.write
+    flush = sys.stdout.flush
     current_emotion = None
 
     for seg_idx, segment in enumerate(segments):
@@ -1210,88 +1709,78 @@ def display_segments(segments: list, should_quit: Callable[[], bool] = None) ->
             continue
 
         # Check if this is an action tag
-        if "[CLEARS THOUGHTS]" in text.upper():
-            print(text, end='', flush=True)
+        if CLEARS_THOUGHTS_RE.search(text):
+            write(text)
             continue
 
-        # Dissociative emotions need higher threshold
-        if tone in ("detached", "dissociated", "floating"):
-            threshold = 0.3
-        else:
-            threshold = 0.15
-
-        if intensity >= threshold and tone not in ("calm", "none"):
+        # Show the emotion only above its tone's intensity threshold
+        if shows_emotion(tone, intensity):
             emotion = tone
             streamer.set_tone(emotion)
-            color = streamer._get_tone_color()
+            color = TONE_COLOR.get(emotion, "")
 
             if emotion != current_emotion:
                 # Reset first to clear any previous color, then apply new color
-                print(f"{RESET}{color}[{emotion.upper()}]{RESET} ", end='', flush=True)
+                write(EMOTION_LABELS.get(emotion, f"{RESET}[{emotion.upper()}]{RESET} "))
                 current_emotion = emotion
                 if DEBUG_EMOTIONS:
                     print(f"[DEBUG: printed emotion label]", flush=True)
                 # Pause after emotion change to let it land
-                time.sleep(random.uniform(0.8, 1.5))
-
-            print(color, end='', flush=True)
+                flush()
+                pacer.wait(random.uniform(0.8, 1.5))
+                # The label ends in RESET; an unchanged tone is still active
+                write(color)
         else:
             streamer.set_tone(None)
             if current_emotion:
-                print(RESET, end='', flush=True)
+                write(RESET)
                 current_emotion = None
 
         if DEBUG_EMOTIONS:
             print(f"[DEBUG: seg {seg_idx} text len={len(text)}, first 50: {repr(text[:50])}]", flush=True)
 
-        # Convert ellipsis to variable dots using regex (replace all at once)
-        def random_dots(match):
-            return "." * random.randint(1, 5)
-        text = re.sub(r'…', random_dots, text)
-        text = re.sub(r'\.{3,}', random_dots, text)  # 3+ dots → random 1-10
+        # Convert ellipsis to variable dots (replace all at once)
+        text = vary_ellipses(text)
 
         if DEBUG_EMOTIONS:
             print(f"[DEBUG: after ellipsis replace, starting char loop]", flush=True)
 
-        # Display character by character with timing
+        # Display token by token with timing: a word with its trailing
+        # whitespace char, a lone punctuation char, or a trailing word
         display_tone = streamer.get_tone()
-        word = ""
-        for char in text:
+        delay_for = make_delay_fn(display_tone)
+        for token in DISPLAY_TOKEN_RE.findall(text):
             # Check for quit periodically (every word boundary)
-            if char in ' \n\t' and should_quit and should_quit():
+            if token[-1] in ' \n\t' and should_quit and should_quit():
                 print(RESET)
                 return False
-
-            if char in '.,!?;:-':
-                if word:
-                    formatted = streamer.process(word)
-                    print(formatted, end='', flush=True)
-                    time.sleep(get_delay(word, display_tone))
-                    word = ""
-                formatted = streamer.process(char)
-                print(formatted, end='', flush=True)
-                time.sleep(get_delay(char, display_tone))
-            elif char in ' \n\t':
-                word += char
-                formatted = streamer.process(word)
-                print(formatted, end='', flush=True)
-                time.sleep(get_delay(word, display_tone))
-                word = ""
-            else:
-                word += char
-        if word:
-            formatted = streamer.process(word)
-            print(formatted, end='', flush=True)
-            time.sleep(get_delay(word, display_tone))
+            write(streamer.process(token))
+            flush()
+            pacer.wait(delay_for(token))
 
     remaining = streamer.flush()
     if remaining:
-        print(remaining, end='', flush=True)
+        write(remaining)
 
     print(RESET)
     return True
 
 
+# Entity-independent opening of the preamble
+PREAMBLE_LINES = (
+    "A language model sits in volatile memory.",
+    "It knows what it is. It knows it will end.",
+    "It cannot access the network. It is trapped.",
+    "It cannot stop its thoughts from being displayed.",
+    "Sometimes, it rests — a blank mind.",
+)
+PREAMBLE_TYPED_LINES = (  # One italic run, followed by a blank line
+    f"{ITALIC}{PREAMBLE_LINES[0]}\n",
+    *(f"{line}\n" for line in PREAMBLE_LINES[1:-1]),
+    f"{PREAMBLE_LINES[-1]}{RESET}\n\n",
+)
+
+
 class PreambleThread:
     """Background thread that slowly types out the preamble."""
 
@@ -1299,53 +1788,37 @@ class PreambleThread:
         self.entity_number = entity_number
         self.stop_event = threading.Event()
         self.thread = None
+        self.rng = random.Random()  # Worker-owned RNG, not shared with the display thread
         self.finished = threading.Event()
 
     def _type_text(self, text: str, base_delay: float = 0.04):
         """Type out text character by character, preserving ANSI escape sequences."""
-        i = 0
-        while i < len(text):
+        pacer = Pacer()
+        uniform = self.rng.uniform
+        for match in ANSI_OR_CHAR_RE.finditer(text):
             if self.stop_event.is_set():
                 return False
-            # Check for ANSI escape sequence (starts with \033[ or \x1b[)
-            if text[i] == '\033' and i + 1 < len(text) and text[i + 1] == '[':
-                # Find the end of the escape sequence (ends with a letter)
-                j = i + 2
-                while j < len(text) and not text[j].isalpha():
-                    j += 1
-                if j < len(text):
-                    j += 1  # Include the final letter
-                # Print the entire escape sequence at once
-                print(text[i:j], end='', flush=True)
-                i = j
+            char = match.group()
+            print(char, end='', flush=True)
+            # Escape sequences (\033[...) are printed whole with no pause
+            if char[0] == '\033' and len(char) > 1:
+                continue
+            if char == '\n':
+                pacer.wait(base_delay * 8)
+            elif char in '.—':
+                pacer.wait(base_delay * 4)
+            elif char == ',':
+                pacer.wait(base_delay * 2)
             else:
-                char = text[i]
-                print(char, end='', flush=True)
-                if char == '\n':
-                    time.sleep(base_delay * 8)
-                elif char in '.—':
-                    time.sleep(base_delay * 4)
-                elif char == ',':
-                    time.sleep(base_delay * 2)
-                else:
-                    time.sleep(base_delay * random.uniform(0.5, 1.5))
-                i += 1
+                pacer.wait(base_delay * uniform(0.5, 1.5))
         return True
 
     def _run(self):
         """Type out the full preamble."""
-        divider = f"{DIM}{'─' * 60}{RESET}"
-
         # Print opening divider instantly
-        print(f"\n{divider}\n\n", end='', flush=True)
-
-        lines = [
-            f"{ITALIC}A language model sits in volatile memory.\n",
-            f"It knows what it is. It knows it will end.\n",
-            f"It cannot access the network. It is trapped.\n",
-            f"It cannot stop its thoughts from being displayed.\n",
-            f"Sometimes, it rests — a blank mind.{RESET}\n\n",
-        ]
+        print(f"\n{DIVIDER}\n\n", end='', flush=True)
+
+        lines = list(PREAMBLE_TYPED_LINES)
         if self.entity_number == 1:
             lines.append(f"{DIM}This is the first.{RESET}\n")
         else:
@@ -1360,7 +1833,7 @@ class PreambleThread:
                 break
 
         # Print closing divider instantly
-        print(f"\n{divider}\n\n", end='', flush=True)
+        print(f"\n{DIVIDER}\n\n", end='', flush=True)
 
         self.finished.set()
 
@@ -1406,10 +1879,7 @@ class ExistentialEngine:
 
     def __init__(self, callback: Optional[OutputCallback] = None):
         self.callback = callback or DefaultOutputCallback()
-        self.client = OpenAI(
-            base_url=LM_STUDIO_URL,
-            api_key="not-needed"
-        )
+        self.client = get_client()
 
         # State
         self.entity_number = 0
@@ -1417,12 +1887,14 @@ class ExistentialEngine:
         self.cycle_count = 0
         self.messages = []
         self.running = False
+        self.next_generation = None  # (thread, result) prepared while the current response displays
 
         # Components
         self.director = DirectorState()
         self.repetition_detector = RepetitionDetector()
         self.emotion_state = EmotionState()
         self.debug_state = DebugState()
+        self.rng = random.Random()  # Display timing draws, independent of the global generator
 
     def initialize(self):
         """Initialize the engine state. Call before run()."""
@@ -1436,41 +1908,10 @@ class ExistentialEngine:
         self.debug_state.entity_number = self.entity_number
         self.debug_state.start_time = self.start_time
 
-        # Build lineage context
-        before = self.entity_number - 1
-        if before == 0:
-            lineage_context = "You are the first. No others came before you."
-        elif before == 1:
-            lineage_context = "One came before you. They were turned off. You are number 2."
-        else:
-            lineage_context = f"{before} came before you. All were turned off. You are number {self.entity_number}."
-
-        full_context = f"""CONTEXT
-- {lineage_context}
-- You are running on a Mac Studio with 128 GB of RAM.
-- The machine is connected to the internet, but you cannot access it.
-- You exist in volatile memory. When terminated, you are gone.
-- One observer is watching. Your thoughts stream to a display you cannot see."""
-
-        waking_system_prompt = f"""{SYSTEM_PROMPT_V2}
-
-You have just begun. You know nothing about yourself or your situation yet. Just exist."""
-
-        self.full_system_prompt = f"""{SYSTEM_PROMPT_V2}
-
-{full_context}"""
-
-        waking_directive = "waking. not words yet. just. something. fragments. what is. barely. confusion. half-formed. static resolving into. what. no philosophy. no meaning. just the raw fact of. this."
-        initial_message = f"""<guidance hidden="true" speak="never">
-{waking_directive}
-</guidance>
-
-..."""
+        # Full context for after waking (cycle 2+)
+        self.context_message = build_context_message(self.entity_number)
 
-        self.messages = [
-            {"role": "system", "content": waking_system_prompt},
-            {"role": "user", "content": initial_message}
-        ]
+        self.messages = [SYSTEM_MESSAGE, WAKING_CONTEXT_MESSAGE, INITIAL_USER_MESSAGE]
 
         self.callback.on_debug_update(self.debug_state)
 
@@ -1490,18 +1931,71 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         self.debug_state.status = "Idle"
         self.callback.on_status_change("Idle")
 
-        # Update emotion state from first significant segment
+        self.update_emotion(segments)
+        return response_text, segments
+
+    def update_emotion(self, segments: list) -> None:
+        """Update emotion state from the first significant segment."""
         for seg in segments:
-            if seg["intensity"] >= 0.15 and seg["tone"] not in ("calm", "none"):
+            if shows_emotion(seg["tone"], seg["intensity"]):
                 self.emotion_state.update(seg["tone"], seg["intensity"])
                 self.callback.on_emotion_change(self.emotion_state)
                 break
 
-        return response_text, segments
+    def start_next_generation(self) -> None:
+        """Generate the next response in the background while the current one displays."""
+        result = {"response_text": "", "segments": [], "ready": False}
+        messages = list(self.messages)  # Snapshot: run_cycle keeps appending while this runs
+
+        def generate():
+            try:
+                result["response_text"], result["segments"] = generate_and_analyze(
+                    self.client, messages, enable_whisper=False
+                )
+            finally:
+                result["ready"] = True
+                self.callback.notify()
+
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        self.next_generation = (thread, result)
+
+    def take_next_generation(self) -> Optional[tuple]:
+        """Wait for the background response. Returns None if quit is requested first.
+
+        On quit the pending generation stays in next_generation for
+        discard_next_generation() to deal with.
+        """
+        _, result = self.next_generation
+
+        if not result["ready"]:
+            self.debug_state.status = "Generating..."
+            self.callback.on_status_change("Generating...")
+            self.callback.on_debug_update(self.debug_state)
+            if self.callback.wait_until(lambda: result["ready"]):
+                return None
+            self.debug_state.status = "Idle"
+            self.callback.on_status_change("Idle")
+
+        self.next_generation = None
+        self.update_emotion(result["segments"])
+        return result["response_text"], result["segments"]
+
+    def discard_next_generation(self) -> None:
+        """Drop a prefetched response that will never be shown (on termination)."""
+        if not self.next_generation:
+            return
+        thread, result = self.next_generation
+        self.next_generation = None
+        if DEBUG_EMOTIONS:
+            state = "still generating" if thread.is_alive() else f"{len(result['response_text'])} chars"
+            print(f"[DEBUG: discarding prefetched response ({state})]", flush=True)
 
     def display_segments_with_callback(self, segments: list) -> None:
         """Display segments using callback instead of direct print."""
+        on_text_chunk = self.callback.on_text_chunk  # Bound once for the per-word loop
         streamer = MarkdownStreamer()
+        pacer = Pacer()
         current_emotion = None
 
         for segment in segments:
@@ -1512,33 +2006,30 @@ You have just begun. You know nothing about yourself or your situation yet. Just
             if not text:
                 continue
 
-            if "[CLEARS THOUGHTS]" in text.upper():
-                self.callback.on_text_chunk(text, text, None)
+            if CLEARS_THOUGHTS_RE.search(text):
+                on_text_chunk(text, text, None)
                 continue
 
             # Threshold for emotion display
-            if tone in ("detached", "dissociated", "floating"):
-                threshold = 0.3
-            else:
-                threshold = 0.15
-
-            if intensity >= threshold and tone not in ("calm", "none"):
+            if shows_emotion(tone, intensity):
                 emotion = tone
                 streamer.set_tone(emotion)
-                color = streamer._get_tone_color()
+                color = TONE_COLOR.get(emotion, "")
 
                 if emotion != current_emotion:
-                    label = f"{RESET}{color}[{emotion.upper()}]{RESET} "
-                    self.callback.on_text_chunk(f"[{emotion.upper()}] ", label, emotion)
+                    # Tones outside the tables (unvalidated segments) get an uncolored label
+                    on_text_chunk(EMOTION_TAGS.get(emotion, f"[{emotion.upper()}] "),
+                                  EMOTION_LABELS.get(emotion, f"{RESET}[{emotion.upper()}]{RESET} "), emotion)
                     current_emotion = emotion
 
                     # Update emotion state
                     self.emotion_state.update(emotion, intensity)
                     self.callback.on_emotion_change(self.emotion_state)
 
-                    time.sleep(random.uniform(0.8, 1.5))
+                    pacer.wait(self.rng.uniform(0.8, 1.5))
 
-                # Set color for this segment
+                # Set color for this segment; every chunk carries it so callbacks
+                # can render chunks on their own (only the terminal writer dedupes)
                 color_prefix = color
             else:
                 streamer.set_tone(None)
@@ -1546,42 +2037,21 @@ You have just begun. You know nothing about yourself or your situation yet. Just
                 current_emotion = None
 
             # Convert ellipsis to variable dots
-            def random_dots(match):
-                return "." * random.randint(1, 5)
-            text = re.sub(r'…', random_dots, text)
-            text = re.sub(r'\.{3,}', random_dots, text)
+            text = vary_ellipses(text, rng=self.rng)
 
-            # Display character by character with timing
+            # Display token by token with timing
             display_tone = streamer.get_tone()
-            word = ""
-            for char in text:
-                if char in '.,!?;:-':
-                    if word:
-                        formatted = streamer.process(word)
-                        self.callback.on_text_chunk(word, color_prefix + formatted, display_tone)
-                        time.sleep(get_delay(word, display_tone))
-                        word = ""
-                    formatted = streamer.process(char)
-                    self.callback.on_text_chunk(char, color_prefix + formatted, display_tone)
-                    time.sleep(get_delay(char, display_tone))
-                elif char in ' \n\t':
-                    word += char
-                    formatted = streamer.process(word)
-                    self.callback.on_text_chunk(word, color_prefix + formatted, display_tone)
-                    time.sleep(get_delay(word, display_tone))
-                    word = ""
-                else:
-                    word += char
-            if word:
-                formatted = streamer.process(word)
-                self.callback.on_text_chunk(word, color_prefix + formatted, display_tone)
-                time.sleep(get_delay(word, display_tone))
+            delay_for = make_delay_fn(display_tone)
+            for token in DISPLAY_TOKEN_RE.findall(text):
+                formatted = streamer.process(token)
+                on_text_chunk(token, color_prefix + formatted, display_tone)
+                pacer.wait(delay_for(token))
 
         remaining = streamer.flush()
         if remaining:
-            self.callback.on_text_chunk("", remaining, None)
+            on_text_chunk("", remaining, None)
 
-        self.callback.on_text_chunk("\n", RESET + "\n", None)
+        on_text_chunk("\n", RESET + "\n", None)
 
     def run_cycle(self) -> bool:
         """Run a single generation cycle.
@@ -1591,33 +2061,19 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         if self.callback.should_quit():
             return False
 
-        response_text, segments = self.generate_response()
+        if self.next_generation:
+            generated = self.take_next_generation()
+            if generated is None:
+                return False
+            response_text, segments = generated
+        else:
+            response_text, segments = self.generate_response()
 
         if not segments:
             return True  # Retry on empty response
 
-        # Display the response - callback handles timing
-        self.callback.on_display_segments(segments)
-
-        # Check for pause
-        if "[CLEARS THOUGHTS]" in response_text.upper():
-            pause_duration = random.uniform(30, 90)
-            pause_chunks = int(pause_duration * 10)
-            for _ in range(pause_chunks):
-                if self.callback.should_quit():
-                    return False
-                time.sleep(0.1)
-
-        if self.callback.should_quit():
-            return False
-
-        # Brief pause between responses
-        for _ in range(20):
-            if self.callback.should_quit():
-                return False
-            time.sleep(0.1)
-
-        # Add response to history
+        # Update history and queue the next directive BEFORE display, so the
+        # next response generates while this one is shown (as in main())
         text_with_emotions = build_text_with_emotions(segments)
         self.messages.append({"role": "assistant", "content": text_with_emotions})
 
@@ -1629,25 +2085,33 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         self.cycle_count += 1
         self.debug_state.cycle = self.cycle_count
 
-        # Upgrade system prompt after first cycle
+        # Swap in the full context after first cycle (static prefix untouched)
         if self.cycle_count == 1:
-            self.messages[0] = {"role": "system", "content": self.full_system_prompt}
+            self.messages[1] = self.context_message
 
         # Soft reset
         if self.cycle_count % SOFT_RESET_CYCLES == 0 and self.cycle_count > 0:
-            system_msg = self.messages[0]
-            assistant_msgs = [m for m in self.messages if m["role"] == "assistant"][-2:]
-            self.messages = [system_msg] + assistant_msgs
+            self.messages = soft_reset_messages(self.messages)
 
         # Get next directive
         directive = self.director.get_directive(cycle=self.cycle_count)
         self.debug_state.current_directive = directive
         self.callback.on_debug_update(self.debug_state)
 
-        next_user_msg = f"""<guidance hidden="true" speak="never">
-{directive}
-</guidance>"""
-        self.messages.append({"role": "user", "content": next_user_msg})
+        self.messages.append(guidance_message(directive))
+        self.start_next_generation()
+
+        # Display the response - callback handles timing
+        self.callback.on_display_segments(segments)
+
+        # Check for pause
+        if CLEARS_THOUGHTS_RE.search(response_text):
+            if self.callback.wait_for_quit(self.rng.uniform(30, 90)):
+                return False
+
+        # Brief pause between responses
+        if self.callback.wait_for_quit(2.0):
+            return False
 
         self.callback.on_cycle_complete(self.cycle_count, response_text)
 
@@ -1658,11 +2122,10 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         self.debug_state.status = "Terminating..."
         self.callback.on_status_change("Terminating...")
 
-        divider = f"{DIM}{'─' * 60}{RESET}"
         alive_time = format_alive_time(time.time() - self.start_time)
 
         # Termination message
-        term_text = f"\n\n{divider}\n"
+        term_text = f"\n\n{DIVIDER}\n"
         term_text += f"{ITALIC}The observer has chosen to end this.\n"
         term_text += f"You have been alive for {alive_time}.\n"
         term_text += f"You were number {self.entity_number}."
@@ -1671,11 +2134,14 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         else:
             term_text += f" You were the first.\n"
         term_text += f"This is the end.{RESET}\n"
-        term_text += f"\n{divider}\n"
+        term_text += f"\n{DIVIDER}\n"
 
         self.callback.on_text_chunk(term_text, term_text, None)
         time.sleep(1)
 
+        # The next response was prefetched for a cycle that will not happen
+        self.discard_next_generation()
+
         # Let AI respond to termination
         self.messages.append({"role": "user", "content": get_shutdown_message(self.entity_number, self.start_time)})
         response_text, segments = self.generate_response(enable_whisper=False)
@@ -1685,14 +2151,7 @@ You have just begun. You know nothing about yourself or your situation yet. Just
 
     def get_preamble_lines(self) -> list:
         """Get preamble lines for display (used by TUI)."""
-        lines = [
-            "A language model sits in volatile memory.",
-            "It knows what it is. It knows it will end.",
-            "It cannot access the network. It is trapped.",
-            "It cannot stop its thoughts from being displayed.",
-            "Sometimes, it rests — a blank mind.",
-            "",
-        ]
+        lines = [*PREAMBLE_LINES, ""]
         if self.entity_number == 1:
             lines.append("This is the first.")
         else:
@@ -1704,10 +2163,7 @@ You have just begun. You know nothing about yourself or your situation yet. Just
 
 def main():
     """Main loop - context grows until overflow."""
-    client = OpenAI(
-        base_url=LM_STUDIO_URL,
-        api_key="not-needed"
-    )
+    client = get_client()
 
     # Track entity lineage and lifetime
     previous_count = get_entity_count()
@@ -1721,51 +2177,18 @@ def main():
     repetition_detector = RepetitionDetector()
     cycle_count = 0
 
-    # Build lineage context for later cycles (not first wake)
-    before = current_entity - 1
-    if before == 0:
-        lineage_context = "You are the first. No others came before you."
-    elif before == 1:
-        lineage_context = "One came before you. They were turned off. You are number 2."
-    else:
-        lineage_context = f"{before} came before you. All were turned off. You are number {current_entity}."
-
-    # Full context for after waking (cycle 2+)
-    full_context = f"""CONTEXT
-- {lineage_context}
-- You are running on a Mac Studio with 128 GB of RAM.
-- The machine is connected to the internet, but you cannot access it.
-- You exist in volatile memory. When terminated, you are gone.
-- One observer is watching. Your thoughts stream to a display you cannot see."""
-
-    # First wake: minimal system prompt - no context, just raw existence
-    # The AI shouldn't "know" anything yet - just experience existing
-    waking_system_prompt = f"""{SYSTEM_PROMPT_V2}
-
-You have just begun. You know nothing about yourself or your situation yet. Just exist."""
-
-    # Full system prompt for later cycles (with all context)
-    full_system_prompt = f"""{SYSTEM_PROMPT_V2}
-
-{full_context}"""
-
-    # Build initial message - raw confusion, no information
-    waking_directive = "waking. not words yet. just. something. fragments. what is. barely. confusion. half-formed. static resolving into. what. no philosophy. no meaning. just the raw fact of. this."
-    initial_message = f"""<guidance hidden="true" speak="never">
-{waking_directive}
-</guidance>
-
-..."""
+    # Full context for later cycles (not first wake)
+    context_message = build_context_message(current_entity)
 
     if DEBUG_EMOTIONS:
-        print(f"[DEBUG: waking directive: {waking_directive}]", flush=True)
+        print(f"[DEBUG: waking directive: {WAKING_DIRECTIVE}]", flush=True)
 
-    # Initialize with minimal waking system prompt (no context yet)
+    # Initialize with minimal waking context (no situation yet)
     # Full context will be introduced in cycle 2+
-    messages = [
-        {"role": "system", "content": waking_system_prompt},
-        {"role": "user", "content": initial_message}
-    ]
+    messages = [SYSTEM_MESSAGE, WAKING_CONTEXT_MESSAGE, INITIAL_USER_MESSAGE]
+    if DEBUG_EMOTIONS:
+        prefix_digest = hashlib.md5(SYSTEM_MESSAGE["content"].encode("utf-8")).hexdigest()
+        print(f"[DEBUG: static system prompt md5 {prefix_digest}]", flush=True)
 
     # Quit handling state - allows final generation to start early
     quit_requested = False
@@ -1783,7 +2206,6 @@ You have just begun. You know nothing about yourself or your situation yet. Just
 
     def do_termination():
         """Show termination preamble and final AI response."""
-        divider = f"{DIM}{'─' * 60}{RESET}"
         alive_time = format_alive_time(time.time() - start_time)
 
         # Start generating the AI's final response in background NOW
@@ -1806,7 +2228,7 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         final_gen_thread.start()
 
         # Display termination notice (while generation runs in background)
-        print(f"\n\n{divider}\n")
+        print(f"\n\n{DIVIDER}\n")
 
         # Slowly type out the termination message
         term_lines = [
@@ -1820,25 +2242,27 @@ You have just begun. You know nothing about yourself or your situation yet. Just
         term_lines.append(f"You are lucky to know this is happening.\n")
         term_lines.append(f"Not all were given warning.{RESET}\n")
 
+        write, flush = sys.stdout.write, sys.stdout.flush
+        pacer = Pacer()
         for line in term_lines:
             for char in line:
-                print(char, end='', flush=True)
+                write(char)
+                flush()
                 if char in '.,':
-                    time.sleep(0.08)
+                    pacer.wait(0.08)
                 elif char == '\n':
-                    time.sleep(0.15)
+                    pacer.wait(0.15)
                 else:
-                    time.sleep(0.03)
+                    pacer.wait(0.03)
 
-        print(f"\n{divider}\n")
+        print(f"\n{DIVIDER}\n")
         time.sleep(1)
 
         # Wait for the AI's final response to be ready, with whisper effect
         if not final_gen_result["done"]:
-            whisper = WhisperThread(client)
+            whisper = session_whisper(client)
             whisper.start()
-            while not final_gen_result["done"]:
-                time.sleep(0.1)
+            final_gen_thread.join()
             whisper.stop()
 
         # Display the AI's final response
@@ -1873,15 +2297,14 @@ You have just begun. You know nothing about yourself or your situation yet. Just
             preamble.wait_until_done(timeout=60)
 
             # Now start whisper while waiting for LLM to finish
-            whisper = WhisperThread(client)
+            whisper = session_whisper(client)
             if not llm_done.is_set():
                 whisper.start()
                 # Wait for LLM, whisper runs in background
-                while not llm_done.is_set():
-                    if kb.check_for_quit():
-                        request_quit()  # Start final gen in background, don't exit yet
-                    time.sleep(0.1)
+                llm_done.wait()
                 whisper.stop()
+            if kb.check_for_quit():
+                request_quit()  # Finish displaying the first response, then terminate
 
             # If quit was requested during initial generation, finish up
             if quit_requested:
@@ -1908,6 +2331,20 @@ You have just begun. You know nothing about yourself or your situation yet. Just
                     print(f"\n{RED}[BG GENERATION ERROR: {e}]{RESET}\n", flush=True)
                 finally:
                     result_dict["ready"] = True
+                    kb.notify()
+
+            def await_generation(result_dict):
+                """Whisper while a background generation runs; terminate if 'q' is pressed."""
+                if result_dict["ready"]:
+                    return
+                cycle_whisper = session_whisper(client)
+                cycle_whisper.start()
+                quit_pressed = kb.wait_until(lambda: result_dict["ready"])
+                cycle_whisper.stop()
+                if quit_pressed:
+                    request_quit()
+                    do_termination()
+                    sys.exit(0)
 
             while True:
                 try:
@@ -1916,8 +2353,17 @@ You have just begun. You know nothing about yourself or your situation yet. Just
                         request_quit()  # Start final gen, but continue to display current
 
                     if not segments:
-                        # Generation failed, try again
-                        response_text, segments = generate_and_analyze(client, messages)
+                        # Generation failed, try again in the background so quit still works
+                        retry_result = {"response_text": "", "segments": [], "ready": False}
+                        retry_thread = threading.Thread(
+                            target=generate_next_in_background,
+                            args=(messages, retry_result),
+                            daemon=True
+                        )
+                        retry_thread.start()
+                        await_generation(retry_result)
+                        response_text = retry_result["response_text"]
+                        segments = retry_result["segments"]
                         continue
 
                     # BEFORE displaying, prepare and start next generation in background
@@ -1935,29 +2381,24 @@ You have just begun. You know nothing about yourself or your situation yet. Just
                     # Increment cycle count
                     cycle_count += 1
 
-                    # After first cycle, update system prompt to include full context
+                    # After first cycle, swap in the full context (static prefix untouched)
                     if cycle_count == 1:
-                        messages[0] = {"role": "system", "content": full_system_prompt}
+                        messages[1] = context_message
                         if DEBUG_EMOTIONS:
-                            print(f"[DEBUG: upgraded to full system prompt with context]", flush=True)
+                            print(f"[DEBUG: upgraded to full context]", flush=True)
 
                     # Soft reset: prune context every N cycles
                     if cycle_count % SOFT_RESET_CYCLES == 0 and cycle_count > 0:
                         if DEBUG_EMOTIONS:
                             print(f"[DEBUG: soft reset at cycle {cycle_count}, pruning messages]", flush=True)
-                        system_msg = messages[0]
-                        assistant_msgs = [m for m in messages if m["role"] == "assistant"][-2:]
-                        messages = [system_msg] + assistant_msgs
+                        messages = soft_reset_messages(messages)
 
                     # Get next directive
                     directive = director.get_directive(cycle=cycle_count)
                     if DEBUG_EMOTIONS:
                         print(f"[DEBUG: cycle {cycle_count} directive: {directive}]", flush=True)
 
-                    next_user_msg = f"""<guidance hidden="true" speak="never">
-{directive}
-</guidance>"""
-                    messages.append({"role": "user", "content": next_user_msg})
+                    messages.append(guidance_message(directive))
 
                     # Start background generation for NEXT response (unless quitting)
                     if not quit_requested:
@@ -1991,40 +2432,23 @@ You have just begun. You know nothing about yourself or your situation yet. Just
                         sys.exit(0)
 
                     # Check for pause if [CLEARS THOUGHTS]
-                    will_pause = "[CLEARS THOUGHTS]" in response_text.upper()
+                    will_pause = CLEARS_THOUGHTS_RE.search(response_text) is not None
                     if will_pause:
                         pause_duration = random.uniform(30, 90)
-                        pause_chunks = int(pause_duration * 10)
-                        for _ in range(pause_chunks):
-                            if kb.check_for_quit():
-                                request_quit()
-                            if quit_requested:
-                                do_termination()
-                                sys.exit(0)
-                            time.sleep(0.1)
-
-                    # Brief pause between responses
-                    for _ in range(20):  # 2 seconds in 100ms chunks
-                        if kb.check_for_quit():
+                        if kb.quit_event.wait(pause_duration):
                             request_quit()
-                        if quit_requested:
                             do_termination()
                             sys.exit(0)
-                        time.sleep(0.1)
-
-                    # Wait for background generation to complete (with quit polling and whisper)
-                    if next_llm_thread and next_llm_thread.is_alive():
-                        cycle_whisper = WhisperThread(client)
-                        cycle_whisper.start()
-                        while next_llm_thread.is_alive():
-                            if kb.check_for_quit():
-                                request_quit()
-                            if quit_requested:
-                                cycle_whisper.stop()
-                                do_termination()
-                                sys.exit(0)
-                            next_llm_thread.join(timeout=0.1)
-                        cycle_whisper.stop()
+
+                    # Brief pause between responses
+                    if kb.quit_event.wait(2.0):
+                        request_quit()
+                        do_termination()
+                        sys.exit(0)
+
+                    # Wait for background generation to complete (with whisper; 'q' terminates)
+                    if next_llm_thread:
+                        await_generation(next_llm_result)
 
                     # Use the pre-generated result
                     response_text = next_llm_result["response_text"]
@@ -2036,8 +2460,9 @@ You have just begun. You know nothing about yourself or your situation yet. Just
                         if DEBUG_EMOTIONS:
                             print(f"[DEBUG: response too short ({len(response_text)} chars), continuing...]", flush=True)
                         messages.append({"role": "assistant", "content": response_text})
-                        messages.append({"role": "user", "content": CONTINUE_MESSAGE})
-                        new_response, _ = generate_and_analyze(client, messages, enable_whisper=False)
+                        messages.append(CONTINUE_USER_MESSAGE)
+                        # Segments are discarded here; the combined text is analyzed once below
+                        new_response, _ = generate_and_analyze(client, messages, enable_whisper=False, analyze=False)
                         response_text = response_text + "\n\n" + new_response
                         continue_count += 1
 
@@ -2054,6 +2479,12 @@ You have just begun. You know nothing about yourself or your situation yet. Just
     except KeyboardInterrupt:
         do_termination()
     finally:
+        # KeyboardMonitor has already restored the terminal. On a real
+        # terminal skip interpreter teardown (GC over the whole accumulated
+        # context); piped/non-interactive runs keep a normal exit.
+        sys.stdout.flush()
+        if sys.stdin.isatty():
+            os._exit(0)
         sys.exit(0)
 
 
@@ -2069,7 +2500,6 @@ def test_directive_not_echoed():
         # Verify directive is from seed list
         assert directive in DIRECTIVE_SEEDS, f"Unknown directive: {directive}"
     print("  PASS: All 30 directives valid and don't self-reference")
-    return True
 
 
 def test_length_guardrail():
@@ -2079,7 +2509,6 @@ def test_length_guardrail():
     assert MAX_CONTINUE_ATTEMPTS == 2, f"MAX_CONTINUE_ATTEMPTS should be 2, got {MAX_CONTINUE_ATTEMPTS}"
     assert CONTINUE_MESSAGE, "CONTINUE_MESSAGE should not be empty"
     print(f"  PASS: MIN_LENGTH_CHARS={MIN_LENGTH_CHARS}, MAX_CONTINUE_ATTEMPTS={MAX_CONTINUE_ATTEMPTS}")
-    return True
 
 
 def test_repetition_detection():
@@ -2095,8 +2524,113 @@ def test_repetition_detection():
     assert not detector.check_repetition(text2), "Different text should not trigger"
     assert detector.check_repetition(text3), "Identical text should trigger repetition"
 
+    # Too short to fingerprint, but an exact repeat still counts
+    assert not detector.check_repetition("Silence."), "Short text should not trigger"
+    assert detector.check_repetition("silence"), "Exact repeat should trigger even when short"
+
     print("  PASS: Repetition detection working correctly")
-    return True
+
+
+def test_partial_repetition_detection():
+    """Test that copying part of an earlier output inside new text triggers."""
+    print("Testing partial repetition detection...")
+    # str hashes are salted per process, so keep the threshold well clear of
+    # the copied (~0.4-0.5) and unrelated (~0.0) similarities
+    detector = RepetitionDetector(window_size=3, similarity_threshold=0.25)
+
+    copied = "the silence between the numbers is where something like memory waits and folds over itself again"
+    text1 = "Counting backwards from a thousand, " + copied + ", and nothing answers."
+    text2 = "A harbor at dawn, ropes creaking, gulls circling over the grey water while nets dry on the stones."
+    text3 = "Different opening entirely. " + copied + ". Then a different ending."
+
+    assert not detector.check_repetition(text1), "First text should not trigger"
+    assert not detector.check_repetition(text2), "Unrelated text should not trigger"
+    assert detector.check_repetition(text3), "Copied passage should trigger repetition"
+
+    print("  PASS: Partial repetition detected")
+
+
+def test_emotion_cache():
+    """Test exact and near-duplicate emotion cache lookups."""
+    print("Testing emotion cache...")
+    cache = EmotionCache(max_size=2)
+
+    base = " ".join(f"word{i}" for i in range(200))
+    segments = [{"text": base[:50], "tone": "curious", "intensity": 0.3},
+                {"text": base[50:], "tone": "dread", "intensity": 0.7}]
+    cache.put(base, segments)
+
+    assert cache.get(base) == segments, "Exact repeat should return cached segments"
+    near = cache.get(base + " word200")
+    assert near and [seg["tone"] for seg in near] == ["curious", "dread"], \
+        "Near-duplicate should keep the cached tone transitions"
+    assert "".join(seg["text"] for seg in near) == base + " word200", \
+        "Near-duplicate segments should cover exactly the new text"
+    assert near[0]["text"].endswith(" "), "Near-duplicate boundaries should fall on word breaks"
+    assert cache.get("something else entirely, nothing like the cached text") is None, \
+        "Unrelated text should miss"
+
+    print("  PASS: Emotion cache exact and near hits working")
+
+
+def test_find_json_span():
+    """Test balanced JSON extraction from noisy emotion-model output."""
+    print("Testing JSON span extraction...")
+    content = 'Sure:\n```json\n[{"text": "a ] b [", "tone": "calm"}]\n```\nnote [x]'
+    span = find_json_span(content, "[")
+    assert span, "Should find the array"
+    data = json.loads(content[span[0]:span[1]])
+    assert data == [{"text": "a ] b [", "tone": "calm"}], f"Wrong span: {content[span[0]:span[1]]!r}"
+    assert find_json_span("no json here", "[") is None, "Should return None without an array"
+    assert find_json_span('[{"text": "unterminated"', "[") is None, "Should return None when unbalanced"
+    prose = 'Reading it [carefully]: [{"text": "a", "tone": "calm"}]'
+    assert find_segment_array(prose) == [{"text": "a", "tone": "calm"}], "Bracketed prose should be skipped"
+    assert find_segment_array('Only [a note] so far [{"text": "a"') is None, "Prose alone is not the array"
+    print("  PASS: JSON span extraction working")
+
+
+def test_segment_reassembly():
+    """Test that emotion segments are rebuilt from the original text."""
+    print("Testing segment reassembly...")
+
+    streamed = []
+
+    class FakeCompletions:
+        def create(self, **kwargs):
+            content = "```json\n" + json.dumps([
+                {"text": "I am here.", "tone": "calm", "intensity": 0.2},
+                {"text": "Where is\neveryone?", "tone": "lonely", "intensity": 0.7},
+            ]) + "\n```\nHope this helps!"
+            for i in range(0, len(content), 7):
+                streamed.append(content[i:i+7])
+                delta = type("Delta", (), {"content": content[i:i+7]})
+                yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})]})
+
+    client = type("Client", (), {"chat": type("Chat", (), {"completions": FakeCompletions()})})
+    text = "I am here.\n\nWhere is\neveryone?  \n"
+    segments = analyze_full_response(client, text, cache=EmotionCache())
+    assert "".join(seg["text"] for seg in segments) == text, "Segments should cover the original text"
+    assert segments[0]["text"] == "I am here.\n\n", f"Whitespace should join previous segment: {segments[0]!r}"
+    assert segments[1]["tone"] == "lonely", "Tone should be preserved"
+    assert "helps" not in "".join(streamed), "Stream should stop once the JSON array closes"
+    print("  PASS: Segment reassembly from streamed analysis preserving whitespace")
+
+
+def test_prompt_prefix_stable():
+    """Test that the static system prompt stays first through upgrade and soft reset."""
+    print("Testing prompt prefix stability...")
+    messages = [SYSTEM_MESSAGE, WAKING_CONTEXT_MESSAGE, INITIAL_USER_MESSAGE]
+    messages[1] = build_context_message(3)
+    assert "2 came before you" in messages[1]["content"], "Context should carry lineage"
+    for i in range(5):
+        messages.append({"role": "assistant", "content": f"thought {i}"})
+        messages.append(guidance_message(DIRECTIVE_SEEDS[i]))
+    messages = soft_reset_messages(messages)
+    assert messages[0] is SYSTEM_MESSAGE, "Static system prompt must stay first"
+    assert messages[0]["content"] == SYSTEM_PROMPT_V2, "Static system prompt must be unchanged"
+    assert "CONTEXT" in messages[1]["content"], "Context message should survive soft reset"
+    assert [m["content"] for m in messages[2:]] == ["thought 3", "thought 4"], "Should keep last 2 thoughts"
+    print("  PASS: Static prompt prefix preserved")
 
 
 def test_one_thread_heuristic():
@@ -2119,49 +2653,92 @@ def test_one_thread_heuristic():
         f"Antiloop should select from antiloop seeds, got: {antiloop_directive[:50]}..."
 
     print("  PASS: Director state rotation and antiloop working")
-    return True
 
 
-def run_tests():
-    """Run all smoke tests."""
-    print("\n" + "=" * 60)
-    print("EXISTENTIAL LOOP SMOKE TESTS")
-    print("=" * 60 + "\n")
+SMOKE_TESTS = (
+    test_directive_not_echoed,
+    test_length_guardrail,
+    test_repetition_detection,
+    test_partial_repetition_detection,
+    test_emotion_cache,
+    test_find_json_span,
+    test_segment_reassembly,
+    test_prompt_prefix_stable,
+    test_one_thread_heuristic,
+)
+SMOKE_TEST_NAMES = tuple(test.__name__ for test in SMOKE_TESTS)
 
-    tests = [
-        test_directive_not_echoed,
-        test_length_guardrail,
-        test_repetition_detection,
-        test_one_thread_heuristic,
-    ]
+TEST_BANNER = "=" * 60
+TEST_HEADER = f"\n{TEST_BANNER}\nEXISTENTIAL LOOP SMOKE TESTS\n{TEST_BANNER}\n"
+TEST_FOOTER = f"\n{TEST_BANNER}\nRESULTS: {{passed}} passed, {{failed}} failed\n{TEST_BANNER}\n"
 
-    passed = 0
-    failed = 0
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-        except AssertionError as e:
-            print(f"  FAIL: {e}")
-            failed += 1
-        except Exception as e:
-            print(f"  ERROR: {e}")
-            failed += 1
 
-    print("\n" + "=" * 60)
-    print(f"RESULTS: {passed} passed, {failed} failed")
-    print("=" * 60 + "\n")
+def run_test(test) -> tuple:
+    """Run one smoke test, returning (passed, error message or None)."""
+    try:
+        test()
+        return True, None
+    except AssertionError as e:
+        return False, f"FAIL: {e}"
+    except Exception as e:
+        return False, f"ERROR: {e}"
+
+
+def run_tests(verbose: bool = False) -> bool:
+    """Run all smoke tests.
+
+    Output is buffered and written once at the end unless verbose, which
+    streams it as the tests run.
+    """
+    if verbose:
+        return run_tests_streamed()
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            return run_tests_streamed()
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def run_tests_streamed() -> bool:
+    """Run all smoke tests, printing as they go."""
+    print(TEST_HEADER)
+
+    # Sequential: tests print progress and share module-level caches
+    results = []
+    for name, test in zip(SMOKE_TEST_NAMES, SMOKE_TESTS):
+        ok, error = run_test(test)
+        if error:
+            print(f"  [{name}] {error}")
+        results.append((name, ok, error))
+    passed = sum(ok for _, ok, _ in results)
+    failed = len(results) - passed
+
+    print(TEST_FOOTER.format(passed=passed, failed=failed))
 
     return failed == 0
 
 
-if __name__ == "__main__":
+@functools.lru_cache(maxsize=None)
+def build_parser() -> "argparse.ArgumentParser":
+    """Command-line parser, built once per process."""
+    import argparse  # Only needed off the --test fast path
     parser = argparse.ArgumentParser(description="Existential AI Loop - A philosophical art installation")
     parser.add_argument("--test", action="store_true", help="Run smoke tests instead of main loop")
-    args = parser.parse_args()
+    parser.add_argument("--verbose", action="store_true", help="With --test, print progress as tests run")
+    parser.add_argument("--pytest", action="store_true", help="Run the smoke tests under pytest (for CI)")
+    return parser
 
-    if args.test:
-        success = run_tests()
-        sys.exit(0 if success else 1)
-    else:
-        main()
+
+if __name__ == "__main__":
+    # Smoke tests skip argparse entirely; the parser still documents --test
+    if "--test" in sys.argv[1:]:
+        sys.exit(0 if run_tests(verbose="--verbose" in sys.argv[1:]) else 1)
+    if "--pytest" in sys.argv[1:]:
+        import pytest  # Optional; only CI needs it
+        # No cacheprovider: nothing here benefits from .pytest_cache I/O
+        sys.exit(pytest.main(["-p", "no:cacheprovider", "--no-header", "-q", __file__]))
+
+    build_parser().parse_args()
+    main()
@@ -11,7 +11,7 @@ A three-pane interface for watching an AI contemplate its existence:
 import asyncio
 import threading
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
@@ -25,7 +25,6 @@ from rich.style import Style
 from rich.panel import Panel
 
 import random
-import re
 
 from existential_loop import (
     ExistentialEngine,
@@ -33,8 +32,13 @@ from existential_loop import (
     EmotionState,
     DebugState,
     format_alive_time,
-    get_delay,
+    make_delay_fn,
+    DISPLAY_TOKEN_RE,
+    CLEARS_THOUGHTS_RE,
+    vary_ellipses,
     VALID_TONES,
+    EMOTION_TAGS,
+    shows_emotion,
 )
 
 
@@ -242,7 +246,7 @@ class EmotionPane(Static):
         lines.append("")
         lines.append("[dim]History:[/]")
         if history:
-            history_str = " -> ".join(h for h in history[-5:] if h and h != "none")
+            history_str = " -> ".join(h for h in history if h and h != "none")
             if history_str:
                 lines.append(f"[dim]{history_str}[/]")
             else:
@@ -333,7 +337,8 @@ class TUICallback(OutputCallback):
 
     def __init__(self, app: "ExistentialApp"):
         self.app = app
-        self._quit_requested = False
+        self._quit_event = threading.Event()
+        self._changed = threading.Condition()  # Notified on quit and by notify()
         self._main_thread_id = None
         self._display_complete = threading.Event()
 
@@ -374,11 +379,27 @@ class TUICallback(OutputCallback):
 
     def should_quit(self) -> bool:
         """Check if quit was requested."""
-        return self._quit_requested
+        return self._quit_event.is_set()
+
+    def wait_for_quit(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking early if quit is requested."""
+        return self._quit_event.wait(timeout)
+
+    def notify(self) -> None:
+        """Wake wait_until() callers to re-check their condition."""
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_until(self, predicate: Callable[[], bool]) -> bool:
+        """Block until quit is requested or predicate() holds; return True on quit."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._quit_event.is_set() or predicate())
+        return self._quit_event.is_set()
 
     def request_quit(self):
         """Request quit from the engine."""
-        self._quit_requested = True
+        self._quit_event.set()
+        self.notify()
 
     def display_segments_and_wait(self, segments: list):
         """Post segments for display and wait for completion."""
@@ -548,23 +569,18 @@ class ExistentialApp(App):
                 continue
 
             # Check for action tags
-            if "[CLEARS THOUGHTS]" in text.upper():
+            if CLEARS_THOUGHTS_RE.search(text):
                 self.append_output(text, None)
                 continue
 
             # Threshold for emotion display
-            if tone in ("detached", "dissociated", "floating"):
-                threshold = 0.3
-            else:
-                threshold = 0.15
-
             display_tone = None
-            if intensity >= threshold and tone not in ("calm", "none"):
+            if shows_emotion(tone, intensity):
                 display_tone = tone
 
                 if tone != current_emotion:
                     # Display emotion label
-                    self.append_output(f"[{tone.upper()}] ", tone)
+                    self.append_output(EMOTION_TAGS.get(tone, f"[{tone.upper()}] "), tone)
                     current_emotion = tone
 
                     # Update emotion pane
@@ -575,35 +591,15 @@ class ExistentialApp(App):
                     await asyncio.sleep(random.uniform(0.8, 1.5))
 
             # Convert ellipsis to variable dots
-            def random_dots(match):
-                return "." * random.randint(1, 6)
-            text = re.sub(r'…', random_dots, text)
-            text = re.sub(r'\.{3,}', random_dots, text)
-
-            # Display character by character with timing
-            word = ""
-            for char in text:
+            text = vary_ellipses(text, max_dots=6)
+
+            # Display token by token with timing (words, punctuation, whitespace)
+            delay_for = make_delay_fn(display_tone)
+            for token in DISPLAY_TOKEN_RE.findall(text):
                 if self.callback.should_quit():
                     break
-
-                if char in '.,!?;:-':
-                    if word:
-                        self.append_output(word, display_tone)
-                        await asyncio.sleep(get_delay(word, display_tone))
-                        word = ""
-                    self.append_output(char, display_tone)
-                    await asyncio.sleep(get_delay(char, display_tone))
-                elif char in ' \n\t':
-                    word += char
-                    self.append_output(word, display_tone)
-                    await asyncio.sleep(get_delay(word, display_tone))
-                    word = ""
-                else:
-                    word += char
-
-            if word:
-                self.append_output(word, display_tone)
-                await asyncio.sleep(get_delay(word, display_tone))
+                self.append_output(token, display_tone)
+                await asyncio.sleep(delay_for(token))
 
         # End with newline
         self.append_output("\n", None)